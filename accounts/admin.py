@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 
-from .models import Position, Employee
+from .models import Position, Employee, OutboxEmail
 
 # Define an inline admin descriptor for Employee model
 # which acts a bit like a singleton
@@ -19,4 +19,10 @@ class UserAdmin(BaseUserAdmin):
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
 
-admin.site.register(Position)
\ No newline at end of file
+admin.site.register(Position)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('template', 'to', 'created_at', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('template',)
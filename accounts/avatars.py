@@ -0,0 +1,102 @@
+"""
+Avatar thumbnails.
+
+An uploaded avatar is only stored; the employee is marked `avatar_pending`
+(see signals) and the process_avatars command makes the thumbnails of every
+size in AVATAR_SIZES, as WebP and JPEG. Their names contain a hash of the
+uploaded file, so a new avatar gets new urls and the files can be cached
+forever. Until they exist the original is shown.
+"""
+import hashlib
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from main.fragments import bump_author
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+# square sizes in pixels, the 2x of the 60 pixels slots too
+AVATAR_SIZES = (60, 120)
+
+# extension -> Pillow format and save options
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+THUMBNAIL_DIRECTORY = 'avatars/thumbnails'
+
+
+def thumbnail_name(avatar_hash, size, extension):
+    return f'{THUMBNAIL_DIRECTORY}/{avatar_hash}-{size}.{extension}'
+
+
+def thumbnail_size(size):
+    """The smallest thumbnail at least `size` pixels wide, or the largest one."""
+    return next((thumbnail for thumbnail in AVATAR_SIZES if thumbnail >= size), AVATAR_SIZES[-1])
+
+
+def avatar_urls(employee, size):
+    """{extension: (1x url, 2x url)} of the thumbnails for a `size` pixels slot, None if there are none yet."""
+    if not employee.avatar_hash:
+        return None
+
+    sizes = thumbnail_size(size), thumbnail_size(size * 2)
+    return {
+        extension: tuple(default_storage.url(thumbnail_name(employee.avatar_hash, each, extension)) for each in sizes)
+        for extension in FORMATS
+    }
+
+
+def make_thumbnails(avatar):
+    """Write the thumbnails of the `avatar` file, return its hash."""
+    with avatar.open('rb') as file:
+        data = file.read()
+    avatar_hash = hashlib.sha256(data).hexdigest()[:16]
+
+    image = Image.open(io.BytesIO(data))
+    # phone photos are stored sideways with the rotation in EXIF
+    image = ImageOps.exif_transpose(image).convert('RGB')
+
+    for size in AVATAR_SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for extension, (image_format, options) in FORMATS.items():
+            name = thumbnail_name(avatar_hash, size, extension)
+            # the same upload gives the same files
+            if default_storage.exists(name):
+                continue
+
+            output = io.BytesIO()
+            thumbnail.save(output, image_format, **options)
+            default_storage.save(name, ContentFile(output.getvalue()))
+
+    return avatar_hash
+
+
+def process_pending(batch_size=100):
+    """Make the thumbnails of one batch of new avatars, return (done, failed)."""
+    done = failed = 0
+    for employee in Employee.objects.filter(avatar_pending=True).order_by('id')[:batch_size]:
+        avatar_hash = ''
+        try:
+            avatar_hash = make_thumbnails(employee.avatar)
+        except Exception:
+            # the original stays in use
+            logger.exception('Thumbnails of the avatar of employee %s failed.', employee.pk)
+            failed += 1
+        else:
+            done += 1
+
+        # not if the avatar has been replaced in the meantime, it is pending again
+        updated = Employee.objects.filter(pk=employee.pk, avatar=employee.avatar.name).update(
+            avatar_hash=avatar_hash, avatar_pending=False,
+        )
+        if updated and avatar_hash:
+            bump_author(employee.user_id)
+
+    return done, failed
@@ -0,0 +1,5 @@
+from .reference import positions
+
+
+def position_choices():
+    return [(position.id, position.name) for position in positions.all()]
@@ -10,7 +10,7 @@ from django.utils import timezone
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
-from .models import Position
+from .choices import position_choices
 
 EMPLOYEE_FIELDS = [
     "birthday",
@@ -18,10 +18,6 @@ EMPLOYEE_FIELDS = [
     "avatar",
 ]
 
-POSITION_CHOICES = [
-    (position.id, position.name) for position in Position.objects.all()
-]
-
 
 class UserCacheMixin:
     user_cache = None
@@ -127,7 +123,7 @@ class SignUpForm(UserCreationForm):
 
     email = forms.EmailField(label=_('Email'), help_text=_('Required. Enter an existing email address.'))
     birthday = forms.DateField(label=_('Birthday'), initial=datetime.date.today, widget=forms.widgets.DateInput(attrs={'type': 'date'}))
-    position = forms.ChoiceField(label=_('Position'), widget=forms.Select, choices=POSITION_CHOICES)
+    position = forms.ChoiceField(label=_('Position'), widget=forms.Select, choices=position_choices)
     avatar = forms.ImageField(label=_('Avatar'), required=False)
 
     def clean_email(self):
@@ -232,7 +228,7 @@ class ChangeProfileForm(forms.Form):
     first_name = forms.CharField(label=_('First name'), max_length=30, required=False)
     last_name = forms.CharField(label=_('Last name'), max_length=150, required=False)
     birthday = forms.DateField(label=_('Birthday'), initial=datetime.date.today, widget=forms.widgets.DateInput(attrs={'type': 'date'}))
-    position = forms.ChoiceField(label=_('Position'), widget=forms.Select, choices=POSITION_CHOICES)
+    position = forms.ChoiceField(label=_('Position'), widget=forms.Select, choices=position_choices)
     avatar = forms.ImageField(label=_('Avatar'), required=False)
 
 
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Make the WebP and JPEG thumbnails of the uploaded avatars.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help='Keep processing new avatars until interrupted.')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when nothing is pending.')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            done, failed = process_pending(options['batch_size'])
+            if done or failed:
+                self.stdout.write(
+                    f'Made the thumbnails of {done} avatar(s), {failed} failed in {time.monotonic() - started:.2f}s.'
+                )
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import outbox_stats, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send the queued emails in batches, retrying failed ones with a backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--loop', action='store_true', help='Keep draining the outbox until interrupted.')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--stats', action='store_true', help='Only print the queue depth and latency.')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for name, value in outbox_stats().items():
+                self.stdout.write(f'{name} {value}')
+            return
+
+        while True:
+            started = time.monotonic()
+            sent, failed = send_batch(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Sent {sent}, failed {failed} email(s) in {time.monotonic() - started:.2f}s.'
+                )
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
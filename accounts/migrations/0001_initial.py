@@ -0,0 +1,45 @@
+# Generated by Django 3.2.4 on 2026-10-17 18:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Activation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('code', models.CharField(max_length=20, unique=True)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Employee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('birthday', models.DateField()),
+                ('avatar', models.ImageField(null=True, upload_to='avatars/')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Position',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('administrator_rights', models.BooleanField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='position',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='accounts.position'),
+        ),
+    ]
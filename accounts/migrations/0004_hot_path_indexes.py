@@ -0,0 +1,17 @@
+# Generated by Django 3.2.4 on 2026-10-17 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activation',
+            index=models.Index(fields=['created_at'], name='activation_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.4 on 2026-10-17 19:17
+
+from django.db import migrations, models
+
+
+def queue_existing_avatars(apps, schema_editor):
+    # the thumbnails of the avatars uploaded so far are made by process_avatars
+    Employee = apps.get_model('accounts', 'Employee')
+    Employee.objects.exclude(avatar__isnull=True).exclude(avatar='').update(avatar_pending=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='avatar_hash',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='avatar_pending',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(queue_existing_avatars, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from main.models import Project
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Activation(models.Model):
@@ -9,6 +10,11 @@ class Activation(models.Model):
     code = models.CharField(max_length=20, unique=True)
     email = models.EmailField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='activation_created_at_idx'),
+        ]
+
 
 class Position(models.Model):
     name = models.CharField(max_length=100)
@@ -23,6 +29,9 @@ class Employee(models.Model):
     birthday = models.DateField()
     position = models.ForeignKey(Position, on_delete=models.CASCADE)
     avatar = models.ImageField(null=True, upload_to="avatars/")
+    # see accounts.avatars: the hash in the thumbnail names, empty until they are made
+    avatar_hash = models.CharField(max_length=16, blank=True)
+    avatar_pending = models.BooleanField(default=False, db_index=True)
     project = models.ForeignKey(
         Project,
         on_delete=models.SET_NULL,
@@ -32,3 +41,24 @@ class Employee(models.Model):
 
     def __str__(self):
         return self.user.username
+
+
+class OutboxEmail(models.Model):
+    to = models.EmailField()
+    template = models.CharField(max_length=100)
+    context = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # empty when the email is sent or has run out of attempts
+    next_attempt_at = models.DateTimeField(null=True, default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.template} to {self.to}'
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Avg, F, Min
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .utils import build_mail
+
+# how long a claimed batch stays hidden from the other workers
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(sent_at__isnull=True, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=ids).update(next_attempt_at=now + CLAIM_TIMEOUT)
+
+    return list(OutboxEmail.objects.filter(pk__in=ids))
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.next_attempt_at = None
+    if email.attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'next_attempt_at'])
+
+
+def send_batch(batch_size=None):
+    """Send one batch of due emails over a single connection, return (sent, failed)."""
+    emails = claim_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        return 0, len(emails)
+
+    sent_ids = []
+    try:
+        for email in emails:
+            try:
+                build_mail(email.to, email.template, email.context, connection=connection).send()
+            except Exception as error:
+                mark_failed(email, error)
+            else:
+                sent_ids.append(email.id)
+    finally:
+        connection.close()
+
+    OutboxEmail.objects.filter(pk__in=sent_ids).update(
+        sent_at=timezone.now(), next_attempt_at=None, attempts=F('attempts') + 1
+    )
+
+    return len(sent_ids), len(emails) - len(sent_ids)
+
+
+def outbox_stats(window=timedelta(hours=1)):
+    now = timezone.now()
+    pending = OutboxEmail.objects.filter(sent_at__isnull=True, next_attempt_at__isnull=False)
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    latency = OutboxEmail.objects.filter(sent_at__gte=now - window).aggregate(
+        latency=Avg(F('sent_at') - F('created_at'))
+    )['latency']
+
+    return {
+        'pending': pending.count(),
+        'retrying': pending.filter(attempts__gt=0).count(),
+        'failed': OutboxEmail.objects.filter(sent_at__isnull=True, next_attempt_at__isnull=True).count(),
+        'oldest_pending_age': (now - oldest).total_seconds() if oldest else 0,
+        'average_latency': latency.total_seconds() if latency else 0,
+    }
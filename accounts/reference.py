@@ -0,0 +1,4 @@
+from main.reference import ReferenceCache
+from .models import Position
+
+positions = ReferenceCache(Position)
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from main.fragments import bump_author
+from .models import Employee, Position
+from .reference import positions
+
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def invalidate_positions(sender, **kwargs):
+    positions.invalidate()
+
+
+@receiver(pre_save, sender=Employee)
+def queue_avatar_thumbnails(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'avatar' not in update_fields):
+        return
+
+    stored = Employee.objects.filter(pk=instance.pk).values_list('avatar', flat=True).first() if instance.pk else None
+    instance._avatar_changed = (stored or '') != (instance.avatar.name or '')
+    if instance._avatar_changed:
+        # the old thumbnails stay with their urls, the new ones are made by process_avatars
+        instance.avatar_hash = ''
+        instance.avatar_pending = bool(instance.avatar)
+
+
+@receiver(post_save, sender=Employee)
+def bump_avatar_fragments(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and getattr(instance, '_avatar_changed', False):
+        bump_author(instance.user_id)
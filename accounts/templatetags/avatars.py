@@ -0,0 +1,24 @@
+from django import template
+
+from accounts.avatars import avatar_urls
+
+register = template.Library()
+
+
+@register.inclusion_tag('accounts/avatar.html', takes_context=True)
+def avatar(context, employee, size):
+    """The avatar of `employee` in a `size` pixels square, the thumbnails once they are made."""
+    if not employee or not employee.avatar:
+        return {'url': None}
+
+    # resolved once per author and size, a list repeats its authors
+    resolved = context.render_context.setdefault('avatars', {})
+    key = employee.avatar.name, employee.avatar_hash, size
+    if key not in resolved:
+        urls = avatar_urls(employee, size)
+        resolved[key] = {
+            'url': urls['jpg'][0] if urls else employee.avatar.url,
+            'urls': urls,
+            'size': size,
+        }
+    return resolved[key]
@@ -0,0 +1,122 @@
+import datetime
+import io
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User, Group
+from django.core import mail
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from main.models import Project, TaskType, TaskPriority, Task
+from .avatars import AVATAR_SIZES, FORMATS, thumbnail_name
+from .models import Employee, OutboxEmail, Position
+from .outbox import outbox_stats, send_batch
+from .utils import send_change_notification
+
+
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com')
+        executor = User.objects.create_user('executor', 'executor@example.com')
+        cls.task = Task.objects.create(
+            topic='Task',
+            description='Description',
+            start_date=datetime.date(2021, 6, 1),
+            finish_date=datetime.date(2021, 6, 30),
+            type=TaskType.objects.create(name='Bug'),
+            priority=TaskPriority.objects.create(name='High'),
+            estimated_time=8,
+            executor=executor,
+            author=author,
+            project=Project.objects.create(
+                title='Tracker', description='', unique_name='tracker',
+                group_executors=Group.objects.create(name='tracker'),
+            ),
+        )
+
+    def test_notification_is_queued_and_sent_by_the_worker(self):
+        send_change_notification('Field: topic.', self.task)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(outbox_stats()['pending'], 2)
+
+        call_command('send_outbox', stdout=StringIO())
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox), ['author@example.com', 'executor@example.com']
+        )
+        self.assertIn('Task', mail.outbox[0].body)
+        self.assertEqual(outbox_stats()['pending'], 0)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        send_change_notification('Field: topic.', self.task)
+
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', side_effect=OSError('Connection refused')):
+            self.assertEqual(send_batch(), (0, 2))
+
+        email = OutboxEmail.objects.first()
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(send_batch(), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(), (2, 0))
+        self.assertEqual(outbox_stats()['retrying'], 0)
+
+
+class AvatarThumbnailTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(MEDIA_ROOT=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.user = User.objects.create_user('worker', 'worker@example.com', 'password')
+        self.position = Position.objects.create(name='Developer', administrator_rights=False)
+        Employee.objects.create(user=self.user, birthday=datetime.date(1990, 1, 1), position=self.position)
+        self.client.force_login(self.user)
+
+    def upload(self, color):
+        image = io.BytesIO()
+        Image.new('RGB', (1200, 800), color).save(image, 'JPEG')
+        return self.client.post(reverse('accounts:profile'), {
+            'birthday': '1990-01-01',
+            'position': self.position.id,
+            'avatar': SimpleUploadedFile('photo.jpg', image.getvalue(), content_type='image/jpeg'),
+        })
+
+    def test_uploads_get_hashed_thumbnails_from_the_worker(self):
+        self.upload('red')
+        employee = Employee.objects.get(user=self.user)
+        self.assertEqual((employee.avatar_pending, employee.avatar_hash), (True, ''))
+        # the original until the thumbnails are made
+        self.assertContains(self.client.get(reverse('accounts:profile')), employee.avatar.url)
+
+        call_command('process_avatars', stdout=StringIO())
+        employee.refresh_from_db()
+        self.assertFalse(employee.avatar_pending)
+        for size in AVATAR_SIZES:
+            for extension, (image_format, options) in FORMATS.items():
+                with default_storage.open(thumbnail_name(employee.avatar_hash, size, extension)) as file:
+                    image = Image.open(file)
+                    self.assertEqual((image.format, image.size), (image_format, (size, size)))
+
+        response = self.client.get(reverse('accounts:profile'))
+        self.assertContains(response, thumbnail_name(employee.avatar_hash, 60, 'webp'))
+        self.assertContains(response, thumbnail_name(employee.avatar_hash, 120, 'jpg'))
+
+        # saving the profile again keeps the thumbnails, a new avatar gets new names
+        self.client.post(reverse('accounts:profile'), {'birthday': '1990-01-01', 'position': self.position.id})
+        self.assertEqual(Employee.objects.get(user=self.user).avatar_hash, employee.avatar_hash)
+        self.upload('blue')
+        call_command('process_avatars', stdout=StringIO())
+        self.assertNotIn(Employee.objects.get(user=self.user).avatar_hash, ('', employee.avatar_hash))
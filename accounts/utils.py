@@ -4,14 +4,29 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from .models import OutboxEmail
 
-def send_mail(to, template, context):
+
+def build_mail(to, template, context, connection=None):
     html_content = render_to_string(f'accounts/emails/{template}.html', context)
     text_content = render_to_string(f'accounts/emails/{template}.txt', context)
 
-    msg = EmailMultiAlternatives(context['subject'], text_content, settings.DEFAULT_FROM_EMAIL, [to])
+    msg = EmailMultiAlternatives(
+        context['subject'], text_content, settings.DEFAULT_FROM_EMAIL, [to], connection=connection
+    )
     msg.attach_alternative(html_content, 'text/html')
-    msg.send()
+    return msg
+
+
+def send_mail(to, template, context):
+    build_mail(to, template, context).send()
+
+
+def queue_mail(recipients, template, context):
+    # sent later by the send_outbox command
+    OutboxEmail.objects.bulk_create([
+        OutboxEmail(to=to, template=template, context=context) for to in recipients if to
+    ])
 
 
 def send_activation_email(request, email, code):
@@ -34,14 +49,16 @@ def send_activation_change_email(request, email, code):
 
 def send_change_notification(text, task):
     context = {
-        'subject': _('Change notification'),
+        'subject': str(_('Change notification')),
         'text': text,
-        'task': task,
+        'task': {'id': task.id, 'topic': task.topic},
     }
 
-    send_mail(task.author.email, 'change_notification', context)
-    send_mail(task.executor.email, 'change_notification', context)
+    recipients = {task.author.email}
+    if task.executor:
+        recipients.add(task.executor.email)
 
+    queue_mail(sorted(recipients), 'change_notification', context)
 
 
 def send_reset_password_email(request, email, token, uid):
@@ -27,7 +27,8 @@ from .forms import (
     RestorePasswordForm, RestorePasswordViaEmailOrUsernameForm, RemindUsernameForm,
     ResendActivationCodeForm, ResendActivationCodeViaEmailForm, ChangeProfileForm, ChangeEmailForm,
 )
-from .models import Activation, Employee, Position
+from .models import Activation, Employee
+from .reference import positions
 
 
 class GuestOnlyView(View):
@@ -107,7 +108,7 @@ class SignUpView(GuestOnlyView, FormView):
 
         user.employee = Employee()
         user.employee.birthday = form.cleaned_data["birthday"]
-        user.employee.position = Position.objects.get(pk=form.cleaned_data["position"])
+        user.employee.position = positions.get(form.cleaned_data["position"])
         if form.cleaned_data["avatar"]:
             user.employee.avatar = form.cleaned_data["avatar"]
 
@@ -231,9 +232,7 @@ class ProfileView(LoginRequiredMixin, FormView):
         user.first_name = form.cleaned_data['first_name']
         user.last_name = form.cleaned_data['last_name']
         user.employee.birthday = form.cleaned_data['birthday']
-        user.employee.position = Position.objects.get(
-            pk=form.cleaned_data["position"]
-        )
+        user.employee.position = positions.get(form.cleaned_data["position"])
         user.employee.avatar = form.cleaned_data['avatar']
         user.employee.save()
         user.save()
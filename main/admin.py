@@ -1,9 +1,18 @@
 from django.contrib import admin
 
-from .models import Project, TaskType, TaskPriority, Task, Comment
+from .models import Project, TaskType, TaskPriority, Task, TaskChange, Comment
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        # the editor of the changes recorded by the signals
+        obj._editor = request.user
+        super().save_model(request, obj, form, change)
+
 
 admin.site.register(Project)
 admin.site.register(TaskType)
 admin.site.register(TaskPriority)
-admin.site.register(Task)
+admin.site.register(TaskChange)
 admin.site.register(Comment)
@@ -0,0 +1,155 @@
+"""
+Read-only JSON API, mounted at /api/v1/.
+
+Every list takes `fields` (comma separated names) to pick what is returned;
+only the columns and joins of those fields are queried. A list is paged with
+the `cursor` of the previous response (`limit` objects per page), or fetched
+as a batch with `ids` (comma separated, at most MAX_IDS).
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .models import Comment, Project, Task, TimeLoging
+from .pagination import CursorPaginator
+from .permissions import can_work_on_project, get_workable_projects
+
+MAX_IDS = 100
+MAX_LIMIT = 100
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Resource:
+    def __init__(self, **fields):
+        # API name -> lookup of the value
+        self.fields = fields
+
+    def parse_fields(self, value):
+        if not value:
+            return list(self.fields)
+
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f'Unknown fields: {", ".join(unknown)}.')
+        return names
+
+
+PROJECT = Resource(id='id', title='title', description='description', unique_name='unique_name')
+
+TASK = Resource(
+    id='id',
+    topic='topic',
+    description='description',
+    start_date='start_date',
+    finish_date='finish_date',
+    type='type__name',
+    priority='priority__name',
+    estimated_time='estimated_time',
+    time_spent='time_rollup__time_spent',
+    executor='executor__username',
+    author='author__username',
+    project='project__unique_name',
+    version='version',
+)
+
+COMMENT = Resource(id='id', task='task_id', author='author__username', comment='comment', created='created')
+
+TIME_LOG = Resource(
+    id='id',
+    task='task_id',
+    author='author__username',
+    time_spent='time_spent',
+    comment='comment',
+    date='date',
+    created='created',
+)
+
+
+def api_view(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required.'}, status=401)
+
+        # request.project is resolved by main.middleware.ProjectMiddleware
+        project = getattr(request, 'project', None)
+        if project is not None and not can_work_on_project(request.user, project):
+            return JsonResponse({'error': 'You can not work on this project.'}, status=403)
+
+        try:
+            return JsonResponse(view(request, *args, **kwargs))
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=error.status)
+
+    return wrapper
+
+
+def parse_int_list(value, name, limit):
+    try:
+        numbers = [int(number) for number in value.split(',') if number.strip()]
+    except ValueError:
+        raise ApiError(f'{name} must be a comma separated list of numbers.')
+    if len(numbers) > limit:
+        raise ApiError(f'At most {limit} {name} can be fetched at once.')
+    return numbers
+
+
+def list_response(request, resource, queryset):
+    names = resource.parse_fields(request.GET.get('fields'))
+    rows = queryset.values(*{resource.fields[name] for name in names} | {'id'})
+
+    next_cursor = previous_cursor = None
+    if 'ids' in request.GET:
+        ids = parse_int_list(request.GET['ids'], 'ids', MAX_IDS)
+        rows = rows.filter(id__in=ids).order_by('id')
+    else:
+        try:
+            limit = min(int(request.GET.get('limit') or settings.PAGINATE_BY), MAX_LIMIT)
+        except ValueError:
+            raise ApiError('limit must be a number.')
+
+        rows = CursorPaginator(rows, per_page=max(limit, 1)).get_page(request.GET.get('cursor'))
+        next_cursor, previous_cursor = rows.next_cursor, rows.previous_cursor
+
+    return {
+        'results': [{name: row[resource.fields[name]] for name in names} for row in rows],
+        'next': next_cursor,
+        'previous': previous_cursor,
+    }
+
+
+def get_task_id(request, task_id):
+    if not Task.objects.filter(pk=task_id, project=request.project).exists():
+        raise ApiError('Task not found.', status=404)
+    return task_id
+
+
+@api_view
+def projects(request):
+    queryset = Project.objects.all()
+    if not request.user.is_superuser:
+        queryset = queryset.filter(unique_name__in=get_workable_projects(request.user))
+
+    return list_response(request, PROJECT, queryset)
+
+
+@api_view
+def tasks(request, project_name):
+    return list_response(request, TASK, Task.objects.filter(project=request.project))
+
+
+@api_view
+def comments(request, project_name, task_id):
+    return list_response(request, COMMENT, Comment.objects.filter(task_id=get_task_id(request, task_id)))
+
+
+@api_view
+def time_logs(request, project_name, task_id):
+    return list_response(request, TIME_LOG, TimeLoging.objects.filter(task_id=get_task_id(request, task_id)))
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('projects/', api.projects, name='projects'),
+    path('projects/<str:project_name>/tasks/', api.tasks, name='tasks'),
+    path('projects/<str:project_name>/tasks/<int:task_id>/comments/', api.comments, name='comments'),
+    path('projects/<str:project_name>/tasks/<int:task_id>/time_logs/', api.time_logs, name='time_logs'),
+]
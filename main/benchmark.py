@@ -0,0 +1,224 @@
+"""
+Per-view benchmark. Every url of main, accounts and the API is requested
+through the test client against a seeded database; the query count, wall time
+and response size are compared with the budgets checked in next to this
+module. Run it with `manage.py benchmark`.
+"""
+import json
+import math
+import statistics
+import time
+from pathlib import Path
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils.crypto import get_random_string
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from accounts.models import Activation
+from .dataset import seed_dataset
+from .models import TimeLoging
+
+BUDGETS_PATH = Path(__file__).with_name('benchmark_budgets.json')
+
+# room left over the measured values when the budgets are written
+TIME_HEADROOM = 3
+MIN_TIME_HEADROOM_MS = 25
+BYTES_HEADROOM = 1.25
+
+
+class Scenario:
+    """
+    One url to request. `user` is 'admin', 'worker' or None (anonymous);
+    `kwargs` and `setup` get the seeded data and return the url kwargs,
+    `setup` runs before every request (for one-time codes).
+    """
+
+    def __init__(self, url_name, user=None, kwargs=None, params=None, setup=None, name=None):
+        self.url_name = url_name
+        self.user = user
+        self.kwargs = kwargs or (lambda data: {})
+        self.params = params or {}
+        self.setup = setup
+        self.name = name or url_name
+
+
+def project_kwargs(data):
+    return {'project_name': data['project'].unique_name}
+
+
+def task_kwargs(data):
+    return {**project_kwargs(data), 'task_id': data['task_id']}
+
+
+def new_activation(data, email=''):
+    code = get_random_string(20)
+    Activation.objects.create(user=data['inactive'], code=code, email=email)
+    return {'code': code}
+
+
+def restore_password_kwargs(data):
+    user = data['worker']
+    return {'uidb64': urlsafe_base64_encode(force_bytes(user.pk)), 'token': default_token_generator.make_token(user)}
+
+
+def report_params():
+    return {'date_from': '2021-06-01', 'date_to': '2021-06-30', 'group_by': 'author_project'}
+
+
+SCENARIOS = [
+    Scenario('main:index', 'worker'),
+    Scenario('main:projects', 'admin'),
+    Scenario('main:edit_project', 'admin', project_kwargs),
+    Scenario('main:project', 'worker', project_kwargs),
+    Scenario('main:project', 'worker', project_kwargs, params={'q': 'release'}, name='main:project?q'),
+    Scenario('main:tasks_export', 'worker', project_kwargs),
+    Scenario('main:time_logs_export', 'worker', project_kwargs),
+    Scenario('main:task', 'worker', task_kwargs),
+    Scenario('main:edit_task', 'worker', task_kwargs),
+    Scenario('main:time_loging', 'worker', task_kwargs),
+    Scenario('main:log_edit', 'admin', lambda data: {**task_kwargs(data), 'log_id': data['log_id']}),
+    Scenario('main:import_time_logs', 'worker'),
+    Scenario('main:time_report', 'admin', params=report_params()),
+    Scenario('main:search', 'worker', params={'q': 'release'}),
+    Scenario('main:profiles', 'admin'),
+
+    Scenario('accounts:log_in'),
+    Scenario('accounts:log_out', 'worker'),
+    Scenario('accounts:resend_activation_code'),
+    Scenario('accounts:sign_up'),
+    Scenario('accounts:activate', setup=new_activation),
+    Scenario('accounts:restore_password'),
+    Scenario('accounts:restore_password_done'),
+    Scenario('accounts:restore_password_confirm', kwargs=restore_password_kwargs),
+    Scenario('accounts:remind_username'),
+    Scenario('accounts:profile', 'worker'),
+    Scenario('accounts:change_password', 'worker'),
+    Scenario('accounts:change_email', 'worker'),
+    Scenario(
+        'accounts:change_email_activation', 'worker',
+        setup=lambda data: new_activation(data, email='changed@example.com'),
+    ),
+
+    Scenario('api:projects', 'worker'),
+    Scenario('api:tasks', 'worker', project_kwargs),
+    Scenario('api:tasks', 'worker', project_kwargs, params={'fields': 'id,topic,executor'}, name='api:tasks?fields'),
+    Scenario('api:comments', 'worker', task_kwargs),
+    Scenario('api:time_logs', 'worker', task_kwargs),
+]
+
+
+def url_names(patterns, namespace):
+    """Names of every url in `patterns`, the urls the scenarios have to cover."""
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= url_names(pattern.url_patterns, pattern.namespace or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(f'{namespace}:{pattern.name}')
+    return names
+
+
+def seed(scale=1):
+    data = seed_dataset(
+        users=30 * scale, projects=3, tasks_per_project=100 * scale, comments_per_task=3 * scale,
+        logs_per_task=3 * scale,
+    )
+    project = data['projects'][0]
+    worker = project.members[0]
+    # a worker of the first project, working on one of its tasks
+    log = TimeLoging.objects.filter(task__project=project).order_by('id').first()
+    inactive = data['workers'][-1]
+    inactive.is_active = False
+    inactive.save(update_fields=['is_active'])
+
+    return {
+        **data,
+        'project': project,
+        'worker': worker,
+        'task_id': log.task_id,
+        'log_id': log.id,
+        'inactive': inactive,
+    }
+
+
+def measure(client, url, params):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(url, params)
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        elapsed = time.perf_counter() - start
+
+    return response.status_code, len(queries), elapsed * 1000, size
+
+
+def run_scenario(scenario, data, repeat):
+    """Request the url with empty caches, then `repeat` times warm."""
+    client = Client()
+    users = {'admin': data['admin'], 'worker': data['worker']}
+    cache.clear()
+
+    runs = []
+    for _ in range(repeat + 1):
+        if scenario.user:
+            client.force_login(users[scenario.user])
+        kwargs = scenario.kwargs(data)
+        if scenario.setup:
+            kwargs.update(scenario.setup(data))
+        runs.append(measure(client, reverse(scenario.url_name, kwargs=kwargs), scenario.params))
+
+    status, queries, elapsed, size = runs[0]
+    warm = runs[1:] or runs
+    return {
+        'status': max(run[0] for run in runs),
+        'queries': queries,
+        'warm_queries': max(run[1] for run in warm),
+        'ms': round(statistics.median(run[2] for run in warm), 1),
+        'bytes': max(run[3] for run in runs),
+    }
+
+
+def load_budgets():
+    if not BUDGETS_PATH.exists():
+        return {}
+    return json.loads(BUDGETS_PATH.read_text())
+
+
+def budgets_for(results):
+    return {
+        name: {
+            'queries': result['queries'],
+            'warm_queries': result['warm_queries'],
+            'ms': math.ceil(max(result['ms'] * TIME_HEADROOM, result['ms'] + MIN_TIME_HEADROOM_MS)),
+            'bytes': math.ceil(result['bytes'] * BYTES_HEADROOM),
+        }
+        for name, result in results.items()
+    }
+
+
+def save_budgets(budgets):
+    BUDGETS_PATH.write_text(json.dumps(budgets, indent=4, sort_keys=True) + '\n')
+
+
+def check(result, budget, skip_time=False):
+    """The reasons `result` is over `budget`, if any."""
+    if budget is None:
+        return ['no budget']
+    if result['status'] >= 400:
+        return [f'status {result["status"]}']
+
+    problems = []
+    for metric in ('queries', 'warm_queries', 'ms', 'bytes'):
+        if metric == 'ms' and skip_time:
+            continue
+        if result[metric] > budget[metric]:
+            problems.append(f'{metric} {result[metric]} > {budget[metric]}')
+    return problems
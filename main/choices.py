@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from .reference import task_types, task_priorities
+
+WORKER_CHOICES_KEY = 'choices:worker'
+
+
+def cached_choices(key, queryset):
+    """Choices for a form field, built from `queryset` on first use and kept in the cache until invalidated."""
+    choices = cache.get(key)
+    if choices is None:
+        choices = list(queryset)
+        cache.set(key, choices, None)
+    return choices
+
+
+def task_type_choices():
+    return [(task_type.id, task_type.name) for task_type in task_types.all()]
+
+
+def task_priority_choices():
+    return [(priority.id, priority.name) for priority in task_priorities.all()]
+
+
+def worker_choices():
+    return cached_choices(
+        WORKER_CHOICES_KEY,
+        User.objects.exclude(username="AnonymousUser").filter(is_superuser=False).order_by('id').values_list(
+            'id', 'username'
+        ),
+    )
@@ -0,0 +1,232 @@
+import datetime
+import math
+import random
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from guardian.shortcuts import assign_perm
+
+from accounts.models import Employee, Position
+from accounts.reference import positions
+from .choices import WORKER_CHOICES_KEY
+from .models import (
+    Comment, DailyTimeRollup, Project, Task, TaskPriority, TaskTimeRollup, TaskType, TimeLoging,
+)
+from .permissions import invalidate_permissions
+from .projects import invalidate_projects
+from .reference import task_types, task_priorities
+from .search import index_comments, index_tasks
+
+WORDS = (
+    'api', 'backup', 'billing', 'bug', 'cache', 'client', 'dashboard', 'database', 'deploy', 'design',
+    'email', 'export', 'feature', 'import', 'index', 'invoice', 'login', 'migration', 'mobile', 'page',
+    'payment', 'pipeline', 'profile', 'release', 'report', 'search', 'server', 'session', 'signup', 'test',
+)
+
+PASSWORD = 'password'
+START_DATE = datetime.date(2021, 6, 1)
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+class DatasetGenerator:
+    """
+    Generates a synthetic dataset of any size into the database.
+
+    prepare() creates the users (password PASSWORD) with their employee
+    profiles, the projects with their executor groups and grants. Then every
+    chunk of `chunk_size` tasks is created with its comments, time logs,
+    rollups and search documents by create_chunk(). The ids are given up front
+    and every chunk has its own random generator seeded from `seed`, so chunks
+    can be created in any order and by several processes, with the same data.
+    """
+
+    def __init__(self, users=100, projects=5, tasks=10000, comments_per_task=3, logs_per_task=3,
+                 seed=0, chunk_size=1000, prefix='user'):
+        self.users = users
+        self.projects = projects
+        self.tasks = tasks
+        self.comments_per_task = comments_per_task
+        self.logs_per_task = logs_per_task
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+
+    @property
+    def chunks(self):
+        return range(math.ceil(self.tasks / self.chunk_size))
+
+    def rng(self, *parts):
+        return random.Random(':'.join(str(part) for part in (self.seed, *parts)))
+
+    @transaction.atomic
+    def prepare(self):
+        rng = self.rng('prepare')
+        password = make_password(PASSWORD)
+        first_user = next_id(User)
+
+        self.user_ids = list(range(first_user, first_user + self.users))
+        for start in range(0, self.users, self.chunk_size):
+            User.objects.bulk_create([
+                User(id=user_id, username=f'{self.prefix}{user_id}', email=f'{self.prefix}{user_id}@example.com',
+                     password=password)
+                for user_id in self.user_ids[start:start + self.chunk_size]
+            ])
+
+        position, _ = Position.objects.get_or_create(name='Developer', defaults={'administrator_rights': False})
+        self.type_ids = [TaskType.objects.get_or_create(name=name)[0].id for name in ('Bug', 'Feature', 'Chore')]
+        self.priority_ids = [
+            TaskPriority.objects.get_or_create(name=name)[0].id for name in ('Low', 'Normal', 'High')
+        ]
+
+        self.project_ids = []
+        self.members = {}
+        memberships = []
+        employees = []
+        for number in range(self.projects):
+            name = f'{self.prefix}-project{first_user}-{number}'
+            group = Group.objects.create(name=name)
+            project = Project.objects.create(
+                title=f'Project {number}', description=f'<p>{sentence(rng, 12)}</p>',
+                unique_name=name, group_executors=group,
+            )
+            assign_perm('work_on_project', group, project)
+
+            members = self.user_ids[number::self.projects]
+            memberships += [User.groups.through(user_id=user_id, group_id=group.id) for user_id in members]
+            employees += [
+                Employee(user_id=user_id, birthday=datetime.date(1990, 1, 1), position=position, project=project)
+                for user_id in members
+            ]
+            self.project_ids.append(project.id)
+            self.members[project.id] = members
+
+        User.groups.through.objects.bulk_create(memberships, batch_size=self.chunk_size)
+        Employee.objects.bulk_create(employees, batch_size=self.chunk_size)
+
+        self.first_task = next_id(Task)
+        self.first_comment = next_id(Comment)
+        self.first_log = next_id(TimeLoging)
+
+    @transaction.atomic
+    def create_chunk(self, number):
+        """Create the tasks of chunk `number` with everything that belongs to them, return the task count."""
+        rng = self.rng('chunk', number)
+        created = timezone.make_aware(datetime.datetime.combine(START_DATE, datetime.time(9)))
+
+        tasks = []
+        rollups = []
+        comments = []
+        logs = []
+        days = defaultdict(lambda: [0, 0])
+
+        for index in range(number * self.chunk_size, min((number + 1) * self.chunk_size, self.tasks)):
+            task_id = self.first_task + index
+            project_id = self.project_ids[index % len(self.project_ids)]
+            members = self.members[project_id]
+            duration = rng.randint(1, 60)
+
+            tasks.append(Task(
+                id=task_id, topic=sentence(rng, 4), description=sentence(rng, 30),
+                start_date=START_DATE, finish_date=START_DATE + datetime.timedelta(days=duration),
+                type_id=rng.choice(self.type_ids), priority_id=rng.choice(self.priority_ids),
+                estimated_time=rng.randint(1, 40), executor_id=rng.choice(members), author_id=rng.choice(members),
+                project_id=project_id,
+            ))
+
+            for position in range(self.comments_per_task):
+                comments.append(Comment(
+                    id=self.first_comment + index * self.comments_per_task + position,
+                    author_id=rng.choice(members), comment=sentence(rng, 15), task_id=task_id,
+                    created=created + datetime.timedelta(minutes=rng.randint(0, duration * 24 * 60)),
+                ))
+
+            time_spent = 0
+            for position in range(self.logs_per_task):
+                log = TimeLoging(
+                    id=self.first_log + index * self.logs_per_task + position,
+                    author_id=rng.choice(members), time_spent=rng.randint(1, 8), comment=sentence(rng, 6),
+                    task_id=task_id, date=START_DATE + datetime.timedelta(days=rng.randint(0, duration)),
+                    created=created,
+                )
+                logs.append(log)
+                time_spent += log.time_spent
+                totals = days[project_id, task_id, log.author_id, log.date]
+                totals[0] += log.time_spent
+                totals[1] += 1
+
+            rollups.append(TaskTimeRollup(task_id=task_id, time_spent=time_spent, log_count=self.logs_per_task))
+
+        # bulk_create sends no signals, the rollups and search documents are written here
+        Task.objects.bulk_create(tasks)
+        TaskTimeRollup.objects.bulk_create(rollups)
+        Comment.objects.bulk_create(comments, batch_size=self.chunk_size)
+        TimeLoging.objects.bulk_create(logs, batch_size=self.chunk_size)
+        DailyTimeRollup.objects.bulk_create([
+            DailyTimeRollup(
+                project_id=project_id, task_id=task_id, author_id=author_id, day=day,
+                time_spent=time_spent, log_count=log_count,
+            )
+            for (project_id, task_id, author_id, day), (time_spent, log_count) in days.items()
+        ], batch_size=self.chunk_size)
+        index_tasks(tasks)
+        index_comments(comments)
+
+        return len(tasks)
+
+    def finish(self):
+        # the rows were inserted with explicit ids
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, Task, Comment, TimeLoging]):
+                cursor.execute(sql)
+
+        invalidate_permissions()
+        invalidate_projects()
+        task_types.invalidate()
+        task_priorities.invalidate()
+        positions.invalidate()
+        cache.delete(WORKER_CHOICES_KEY)
+
+    def generate(self):
+        """Create the whole dataset in this process."""
+        self.prepare()
+        for number in self.chunks:
+            self.create_chunk(number)
+        self.finish()
+
+
+def seed_dataset(users=30, projects=3, tasks_per_project=100, comments_per_task=3, logs_per_task=3, seed=0):
+    """
+    A small dataset for the benchmark: an `admin` superuser and `worker<id>`
+    users spread over `projects` projects.
+    Returns {'admin': user, 'workers': [...], 'projects': [...]}, every project
+    with its `members`.
+    """
+    admin = User.objects.create(
+        username='admin', email='admin@example.com', password=make_password(PASSWORD),
+        is_superuser=True, is_staff=True,
+    )
+    generator = DatasetGenerator(
+        users=users, projects=projects, tasks=tasks_per_project * projects, comments_per_task=comments_per_task,
+        logs_per_task=logs_per_task, seed=seed, prefix='worker',
+    )
+    generator.generate()
+
+    workers = {user.id: user for user in User.objects.filter(id__in=generator.user_ids)}
+    project_list = list(Project.objects.filter(id__in=generator.project_ids).order_by('id'))
+    for project in project_list:
+        project.members = [workers[user_id] for user_id in generator.members[project.id]]
+
+    return {'admin': admin, 'workers': [workers[user_id] for user_id in generator.user_ids], 'projects': project_list}
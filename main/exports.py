@@ -0,0 +1,66 @@
+import csv
+
+from .models import Task, TimeLoging
+
+TASK_COLUMNS = [
+    ('id', 'id'),
+    ('topic', 'topic'),
+    ('description', 'description'),
+    ('start_date', 'start_date'),
+    ('finish_date', 'finish_date'),
+    ('type', 'type__name'),
+    ('priority', 'priority__name'),
+    ('estimated_time', 'estimated_time'),
+    ('time_spent', 'time_rollup__time_spent'),
+    ('author', 'author__username'),
+    ('executor', 'executor__username'),
+]
+
+TIME_LOG_COLUMNS = [
+    ('id', 'id'),
+    ('date', 'date'),
+    ('task', 'task_id'),
+    ('task_topic', 'task__topic'),
+    ('author', 'author__username'),
+    ('time_spent', 'time_spent'),
+    ('comment', 'comment'),
+    ('created', 'created'),
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object that hands every written line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(columns, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    # values_list() joins the related names in SQL and iterator() reads them
+    # through a server-side cursor, so only one chunk is in memory at a time
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in columns])
+
+    rows = queryset.order_by('id').values_list(*[field for _, field in columns]).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_tasks(project, chunk_size=EXPORT_CHUNK_SIZE):
+    return iter_csv(TASK_COLUMNS, Task.objects.filter(project=project), chunk_size)
+
+
+def export_time_logs(project, task=None, author=None, date_from=None, date_to=None, chunk_size=EXPORT_CHUNK_SIZE):
+    queryset = TimeLoging.objects.filter(task__project=project)
+    if task:
+        queryset = queryset.filter(task_id=task)
+    if author:
+        queryset = queryset.filter(author__username=author)
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+
+    return iter_csv(TIME_LOG_COLUMNS, queryset, chunk_size)
@@ -1,3 +1,4 @@
+import codecs
 import datetime
 
 from django import forms
@@ -8,19 +9,8 @@ from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from tinymce.widgets import TinyMCE
 
-from .models import Project, TaskType, TaskPriority
-
-TASK_TYPE_CHOICES = [
-    (type.id, type.name) for type in TaskType.objects.all()
-]
-
-TASK_PRIORITY_CHOICES = [
-    (priority.id, priority.name) for priority in TaskPriority.objects.all()
-]
-
-ALL_USERS_CHOICES = [
-    (user.id, user.username) for user in User.objects.exclude(username="AnonymousUser").filter(is_superuser=False)
-]
+from .choices import task_type_choices, task_priority_choices, worker_choices
+from .models import Project
 
 
 class ProjectForm(forms.Form):
@@ -30,7 +20,7 @@ class ProjectForm(forms.Form):
     workers = forms.MultipleChoiceField(
         label=_('Workers on the project'),
         widget=forms.CheckboxSelectMultiple,
-        choices=ALL_USERS_CHOICES
+        choices=worker_choices
     )
 
     def clean_project_name(self):
@@ -49,7 +39,7 @@ class ChangeProjectForm(forms.Form):
     workers = forms.MultipleChoiceField(
         label=_('Workers on the project'),
         widget=forms.CheckboxSelectMultiple,
-        choices=ALL_USERS_CHOICES
+        choices=worker_choices
     )
 
 
@@ -58,16 +48,22 @@ class TaskForm(forms.Form):
     description = forms.CharField(label=_('Description'), widget=forms.Textarea)
     start_date = forms.DateField(label=_('Start date'), initial=datetime.date.today, widget=forms.widgets.DateInput(attrs={'type': 'date'}))
     finish_date = forms.DateField(label=_('Finish date'), initial=datetime.date.today, widget=forms.widgets.DateInput(attrs={'type': 'date'}))
-    type = forms.ChoiceField(label=_('Type'), widget=forms.Select, choices=TASK_TYPE_CHOICES)
-    priority = forms.ChoiceField(label=_('Priority'), widget=forms.Select, choices=TASK_PRIORITY_CHOICES)
+    type = forms.ChoiceField(label=_('Type'), widget=forms.Select, choices=task_type_choices)
+    priority = forms.ChoiceField(label=_('Priority'), widget=forms.Select, choices=task_priority_choices)
     estimated_time = forms.IntegerField(label=_('Estimated time'))
     executor = forms.ChoiceField(label=_('Executor'), widget=forms.Select)
 
     def __init__(self, *args, **kwargs):
-        project_name = kwargs.pop('project_name')
-        project = Project.objects.get(unique_name=project_name)
+        project = kwargs.pop('project')
         super(TaskForm, self).__init__(*args, **kwargs)
-        self.fields['executor'].choices = [(user.id, user.username) for user in User.objects.filter(groups__name=project.group_executors.name)]
+        self.fields['executor'].choices = User.objects.filter(
+            groups=project.group_executors_id
+        ).order_by('id').values_list('id', 'username')
+
+
+class EditTaskForm(TaskForm):
+    # the version of the task the form was filled from
+    version = forms.IntegerField(widget=forms.HiddenInput)
 
 
 class CommentForm(forms.Form):
@@ -77,12 +73,58 @@ class CommentForm(forms.Form):
 class TimeLogingForm(forms.Form):
     comment = forms.CharField(max_length=500, label=_('Log comment'), widget=forms.Textarea)
     time_spent = forms.IntegerField(label=_("Time spent (hours)"))
+    date = forms.DateField(label=_('Date'), initial=datetime.date.today, widget=forms.widgets.DateInput(attrs={'type': 'date'}))
+
+
+class TimeReportForm(forms.Form):
+    date_from = forms.DateField(label=_('From'), widget=forms.widgets.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(label=_('To'), widget=forms.widgets.DateInput(attrs={'type': 'date'}))
+    group_by = forms.ChoiceField(
+        label=_('Group by'),
+        choices=[('author', _('User')), ('project', _('Project')), ('author_project', _('User and project'))],
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise ValidationError(_('The start of the range is after its end.'))
+        return cleaned_data
+
+
+class TimeLogExportForm(forms.Form):
+    task = forms.IntegerField(required=False)
+    author = forms.CharField(required=False)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+
+class TimeLogImportForm(forms.Form):
+    file = forms.FileField(label=_('File'))
+    format = forms.ChoiceField(label=_('Format'), choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')])
+
+    # with or without the byte order mark Excel writes
+    encoding = 'utf-8-sig'
+
+    def clean_file(self):
+        # checked before anything is imported, a chunk at a time
+        file = self.cleaned_data['file']
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        try:
+            for chunk in file.chunks():
+                decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            raise ValidationError(_('The file has to be UTF-8 encoded.'))
+
+        file.seek(0)
+        return file
 
 
 class TestForm(forms.Form):
     # workers = forms.MultipleChoiceField(
     #     label=_('Workers on the project'),
     #     widget=forms.CheckboxSelectMultiple,
-    #     choices=ALL_USERS_CHOICES
+    #     choices=worker_choices
     # )
     image = forms.ImageField(label=_('Avatar'))
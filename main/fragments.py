@@ -0,0 +1,77 @@
+"""
+Versioned cache of rendered page fragments (see the fragment_cache template tag).
+
+Every project and task has a version token in the cache; the fragments built
+from it are keyed by the token, so a write only has to replace the token
+(see signals) and the old fragments simply expire.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Comment
+from .reference import task_types, task_priorities
+
+FRAGMENT_NAMES = ('project_tasks', 'task_comments')
+
+
+def _version_key(kind, pk):
+    return f'fragments:{kind}:{pk}:version'
+
+
+def _stats_key(name, hit):
+    return f'fragments:stats:{name}:{"hits" if hit else "misses"}'
+
+
+def fragment_version(kind, pk):
+    key = _version_key(kind, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def project_fragment_version(project_id):
+    # the task list also prints the type and priority names
+    return '.'.join([
+        fragment_version('project', project_id),
+        task_types.current_version(),
+        task_priorities.current_version(),
+    ])
+
+
+def bump(kind, *pks):
+    # after the commit, so a concurrent request can not cache the old rows under the new version
+    def replace_versions():
+        version = uuid.uuid4().hex
+        cache.set_many({_version_key(kind, pk): version for pk in pks}, None)
+
+    transaction.on_commit(replace_versions)
+
+
+def bump_author(user_id):
+    # the comment lists show the avatars of their authors
+    task_ids = Comment.objects.filter(author_id=user_id).values_list('task_id', flat=True).distinct()
+    bump('task', *task_ids)
+
+
+def record(name, hit):
+    key = _stats_key(name, hit)
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def fragment_stats():
+    """{fragment name: (hits, misses)} since the last reset."""
+    keys = {(name, hit): _stats_key(name, hit) for name in FRAGMENT_NAMES for hit in (True, False)}
+    values = cache.get_many(keys.values())
+    return {
+        name: (values.get(keys[name, True], 0), values.get(keys[name, False], 0))
+        for name in FRAGMENT_NAMES
+    }
+
+
+def reset_fragment_stats():
+    cache.delete_many([_stats_key(name, hit) for name in FRAGMENT_NAMES for hit in (True, False)])
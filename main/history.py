@@ -0,0 +1,116 @@
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+
+from .models import Task, TaskChange
+from .reference import task_types, task_priorities
+
+TRACKED_FIELDS = (
+    'topic', 'description', 'start_date', 'finish_date', 'type', 'priority', 'estimated_time', 'executor',
+)
+
+# changes shown on the edit page
+HISTORY_SIZE = 20
+
+REFERENCE_FIELDS = {
+    'type': task_types,
+    'priority': task_priorities,
+}
+
+
+class TaskConflict(Exception):
+    """The task has been edited by somebody else since `version` was loaded."""
+
+
+def update_task(task, values, editor, version):
+    """
+    Write the `values` ({field: value}, foreign keys as ids) that differ from
+    `task`, if the stored task is still at `version`. Only the changed columns
+    are updated; every change is recorded as a TaskChange, which is returned.
+    """
+    changes = []
+    for name, value in values.items():
+        old_value = getattr(task, Task._meta.get_field(name).attname)
+        if old_value != value:
+            changes.append(TaskChange(
+                task=task, editor=editor, version=version + 1, field=name, old_value=old_value, new_value=value,
+            ))
+    if not changes:
+        return []
+
+    columns = {Task._meta.get_field(change.field).attname: change.new_value for change in changes}
+
+    with transaction.atomic():
+        updated = Task.objects.filter(pk=task.pk, version=version).update(version=F('version') + 1, **columns)
+        if not updated:
+            raise TaskConflict
+
+        TaskChange.objects.bulk_create(changes)
+
+        for attname, value in columns.items():
+            setattr(task, attname, value)
+        task.version = version + 1
+
+        # update() sends no signals, the receivers (search index) still have to see the edit
+        post_save.send(
+            sender=Task, instance=task, created=False, raw=False, using=router.db_for_write(Task),
+            update_fields=frozenset([change.field for change in changes] + ['version']),
+        )
+
+    return changes
+
+
+def changes_of_save(task, editor=None, update_fields=None):
+    """
+    The changes a plain save() of the stored `task` (the admin, scripts) is
+    about to write, with `task.version` moved past the stored one so the edit
+    pages opened on the old version reject their edits. See signals.
+    """
+    names = [name for name in TRACKED_FIELDS if update_fields is None or name in update_fields]
+    attnames = [Task._meta.get_field(name).attname for name in names]
+    stored = Task.objects.filter(pk=task.pk).values('version', *attnames).first()
+    if stored is None:
+        return []
+
+    task.version = stored['version'] + 1
+    return [
+        TaskChange(
+            task=task, editor=editor, version=task.version, field=name,
+            old_value=stored[attname], new_value=getattr(task, attname),
+        )
+        for name, attname in zip(names, attnames) if stored[attname] != getattr(task, attname)
+    ]
+
+
+def describe_changes(changes):
+    """(change, old, new) for every change, with the foreign keys resolved to names."""
+    user_ids = {
+        value for change in changes if change.field == 'executor'
+        for value in (change.old_value, change.new_value) if value is not None
+    }
+    users = User.objects.in_bulk(user_ids) if user_ids else {}
+
+    def display(field, value):
+        if value is None:
+            return None
+        if field in REFERENCE_FIELDS:
+            reference = REFERENCE_FIELDS[field]
+            try:
+                return reference.get(value)
+            except reference.model.DoesNotExist:
+                # deleted since, only the tasks still using it are protected
+                return f'#{value}'
+
+        if field == 'executor':
+            return users.get(value, value)
+        return value
+
+    return [(change, display(change.field, change.old_value), display(change.field, change.new_value)) for change in changes]
+
+
+def change_notification_text(editor, changes):
+    lines = [f"Editor: {editor}."]
+    for change, old_value, new_value in describe_changes(changes):
+        lines.append(f"Field: {change.field}. Old value: {old_value}; new value: {new_value}.")
+    return "\n".join(lines)
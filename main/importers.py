@@ -0,0 +1,162 @@
+import csv
+import json
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from guardian.shortcuts import get_objects_for_user
+
+from .forms import TimeLogingForm
+from .models import Project, Task, TimeLoging
+from .rollups import LoggedTime, apply_logged_time
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+def iter_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_jsonl_rows(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+class TimeLogImporter:
+    """
+    Streams time log rows into the database. Rows are validated and inserted
+    batch by batch, so memory use does not depend on the size of the input;
+    invalid rows are reported and skipped, the rest of the file is imported.
+
+    Every row has `task`, `time_spent` and `comment` columns, an optional
+    `date` (YYYY-MM-DD, today by default) and an optional `author` (username).
+    Rows without an author are logged as `default_author`.
+    When `uploader` is given and is not a superuser, rows can only be logged
+    as the uploader. The author always has to be able to work on the project.
+    """
+
+    def __init__(self, default_author=None, uploader=None, batch_size=1000):
+        self.default_author = default_author
+        self.uploader = uploader
+        self.batch_size = batch_size
+        self.imported = 0
+        self.failed = 0
+        self._authors = {}
+        self._allowed_projects = {}
+
+        if default_author is not None:
+            self._authors[default_author.username] = default_author
+
+    def run(self, rows):
+        """Import (line_number, row) pairs, yielding (line_number, error) for the rejected ones."""
+        batch = []
+        for line_number, row in rows:
+            batch.append((line_number, row))
+            if len(batch) == self.batch_size:
+                yield from self._import_batch(batch)
+                batch = []
+        if batch:
+            yield from self._import_batch(batch)
+
+    def import_stream(self, stream, format):
+        rows = iter_csv_rows(stream) if format == 'csv' else iter_jsonl_rows(stream)
+        return self.run(rows)
+
+    def _import_batch(self, batch):
+        errors = []
+        cleaned_rows = []
+
+        for line_number, row in batch:
+            if row is None:
+                errors.append((line_number, _('Can not parse the row.')))
+                continue
+
+            form = TimeLogingForm({
+                'comment': row.get('comment'),
+                'time_spent': row.get('time_spent'),
+                'date': row.get('date') or timezone.localdate(),
+            })
+            if not form.is_valid():
+                errors.append((line_number, '; '.join(
+                    f'{field}: {" ".join(messages)}' for field, messages in form.errors.items()
+                )))
+                continue
+
+            try:
+                task_id = int(row.get('task'))
+            except (TypeError, ValueError):
+                errors.append((line_number, _('Task id is not a number.')))
+                continue
+
+            cleaned_rows.append((line_number, task_id, str(row.get('author') or ''), form.cleaned_data))
+
+        task_projects = dict(
+            Task.objects.filter(pk__in={row[1] for row in cleaned_rows}).values_list('id', 'project_id')
+        )
+        self._load_authors({row[2] for row in cleaned_rows if row[2]})
+
+        new_logs = []
+        changes = []
+        for line_number, task_id, username, cleaned_data in cleaned_rows:
+            error = None
+            author = self._authors.get(username) if username else self.default_author
+
+            if task_id not in task_projects:
+                error = _('Task %(task)s does not exist.') % {'task': task_id}
+            elif author is None:
+                error = _('Unknown author.')
+            elif self.uploader and not self.uploader.is_superuser and author.pk != self.uploader.pk:
+                error = _('You can only import your own logs.')
+            elif task_projects[task_id] not in self._get_allowed_projects(author):
+                error = _('%(author)s can not work on the project of task %(task)s.') % {
+                    'author': author, 'task': task_id,
+                }
+
+            if error:
+                errors.append((line_number, error))
+                continue
+
+            new_logs.append(TimeLoging(
+                author=author,
+                task_id=task_id,
+                time_spent=cleaned_data['time_spent'],
+                comment=cleaned_data['comment'],
+                date=cleaned_data['date'],
+            ))
+            changes.append((LoggedTime(
+                task_projects[task_id], task_id, author.pk, cleaned_data['date'], cleaned_data['time_spent']
+            ), 1))
+
+        # bulk_create does not send signals, so the rollups are updated here once per task and day
+        with transaction.atomic():
+            TimeLoging.objects.bulk_create(new_logs, batch_size=self.batch_size)
+            apply_logged_time(changes)
+
+        self.imported += len(new_logs)
+        self.failed += len(errors)
+
+        yield from sorted(errors)
+
+    def _load_authors(self, usernames):
+        missing = usernames - self._authors.keys()
+        if missing:
+            for user in User.objects.filter(username__in=missing):
+                self._authors[user.username] = user
+
+    def _get_allowed_projects(self, user):
+        if user.pk not in self._allowed_projects:
+            if user.is_superuser:
+                projects = Project.objects.all()
+            else:
+                projects = get_objects_for_user(user, 'main.work_on_project', klass=Project, accept_global_perms=False)
+            self._allowed_projects[user.pk] = set(projects.values_list('id', flat=True))
+
+        return self._allowed_projects[user.pk]
@@ -0,0 +1,134 @@
+"""
+Load test of running servers, see the load_benchmark command.
+
+Every connection requests the paths in turn over keep-alive HTTP/1.1, as fast
+as the server answers, for `duration` seconds; the same load is sent to every
+target (the WSGI and the ASGI server of the same code) one after the other.
+"""
+import asyncio
+import math
+import time
+from urllib.parse import urlsplit
+
+# a request slower than this counts as an error
+REQUEST_TIMEOUT = 30
+
+
+class LoadResult:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.seconds = 0
+
+    @property
+    def requests(self):
+        return len(self.latencies) + self.errors
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'rps': round(len(latencies) / self.seconds, 1) if self.seconds else 0,
+            'p50': round(percentile(latencies, 0.5) * 1000, 1),
+            'p99': round(percentile(latencies, 0.99) * 1000, 1),
+        }
+
+
+def percentile(values, fraction):
+    """`fraction` percentile of the sorted `values` (nearest rank)."""
+    if not values:
+        return 0
+    return values[max(math.ceil(len(values) * fraction) - 1, 0)]
+
+
+async def read_response(reader):
+    """Read one response, return (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by the server.')
+    version, status = status_line.split()[:2]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    else:
+        await reader.read()
+        return int(status), False
+
+    keep_alive = headers.get('connection') != 'close' and version == b'HTTP/1.1'
+    return int(status), keep_alive
+
+
+async def connection_loop(url, paths, headers, deadline, result, offset):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    requests = [
+        (
+            f'GET {parts.path.rstrip("/")}{path} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+            + ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+            + '\r\n'
+        ).encode('latin-1')
+        for path in paths
+    ]
+
+    writer = None
+    number = offset
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(requests[number % len(requests)])
+            await writer.drain()
+            status, keep_alive = await asyncio.wait_for(read_response(reader), REQUEST_TIMEOUT)
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            result.errors += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            continue
+        finally:
+            number += 1
+
+        if status >= 400:
+            result.errors += 1
+        else:
+            result.latencies.append(time.monotonic() - start)
+        if not keep_alive:
+            writer.close()
+            writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def apply_load(name, url, paths, headers=None, concurrency=100, duration=10):
+    """Keep `concurrency` connections busy on `url` for `duration` seconds."""
+    result = LoadResult(name)
+    start = time.monotonic()
+    deadline = start + duration
+    await asyncio.gather(*[
+        connection_loop(url, paths, headers or {}, deadline, result, offset)
+        for offset in range(concurrency)
+    ])
+    result.seconds = time.monotonic() - start
+    return result
+
+
+def run_load(name, url, paths, headers=None, concurrency=100, duration=10):
+    return asyncio.run(apply_load(name, url, paths, headers, concurrency, duration))
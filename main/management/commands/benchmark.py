@@ -0,0 +1,76 @@
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from main.benchmark import (
+    BUDGETS_PATH, SCENARIOS, budgets_for, check, load_budgets, run_scenario, save_budgets, seed,
+)
+from main.metrics import registry
+
+# the benchmark must not read or clear the real cache
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every url against a seeded test database and compare query counts, '
+        'wall time and response sizes with the checked-in budgets.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Warm requests per url.')
+        parser.add_argument('--only', help='Only the scenarios whose name contains this text.')
+        parser.add_argument('--skip-time', action='store_true', help='Do not check the wall time budgets.')
+        parser.add_argument(
+            '--update', action='store_true', help=f'Write the measured values as the new budgets to {BUDGETS_PATH}.',
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [
+            scenario for scenario in SCENARIOS if not options['only'] or options['only'] in scenario.name
+        ]
+
+        # nor write its metrics and profiles next to the real ones, nor need collected static files
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            CACHES=BENCHMARK_CACHES, METRICS_DIR=f'{directory}/metrics', PROFILE_DIR=f'{directory}/profiles',
+            PROFILE_SAMPLE_RATE=0, STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        ):
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                data = seed()
+                results = {scenario.name: run_scenario(scenario, data, options['repeat']) for scenario in scenarios}
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                registry.reset()
+                teardown_test_environment()
+
+        budgets = load_budgets()
+        if options['update']:
+            budgets.update(budgets_for(results))
+            save_budgets(budgets)
+
+        failures = 0
+        self.stdout.write(f'{"view":36} {"status":>6} {"queries":>8} {"warm":>5} {"ms":>8} {"bytes":>9}')
+        for name, result in results.items():
+            problems = check(result, budgets.get(name), options['skip_time'])
+            failures += bool(problems)
+            line = (
+                f'{name:36} {result["status"]:>6} {result["queries"]:>8} {result["warm_queries"]:>5} '
+                f'{result["ms"]:>8} {result["bytes"]:>9}'
+            )
+            if problems:
+                self.stdout.write(self.style.ERROR(f'{line}  {"; ".join(problems)}'))
+            else:
+                self.stdout.write(line)
+
+        if failures:
+            raise CommandError(f'{failures} view(s) over budget.')
+        self.stdout.write(self.style.SUCCESS('All views are within budget.'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.exports import export_tasks, export_time_logs
+from main.forms import TimeLogExportForm
+from main.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Stream the tasks or the time logs of a project as CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['tasks', 'time_logs'])
+        parser.add_argument('project', help='Unique name of the project.')
+        parser.add_argument('--task', help='Only the logs of this task id.')
+        parser.add_argument('--author', help='Only the logs of this username.')
+        parser.add_argument('--from', dest='date_from', help='Only the logs from this date (YYYY-MM-DD).')
+        parser.add_argument('--to', dest='date_to', help='Only the logs up to this date (YYYY-MM-DD).')
+        parser.add_argument('--output', help='File to write to, standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        project = Project.objects.filter(unique_name=options['project']).first()
+        if project is None:
+            raise CommandError(f'Project "{options["project"]}" does not exist.')
+
+        if options['kind'] == 'tasks':
+            lines = export_tasks(project, chunk_size=options['chunk_size'])
+        else:
+            form = TimeLogExportForm({
+                name: options[name] for name in ('task', 'author', 'date_from', 'date_to') if options[name]
+            })
+            if not form.is_valid():
+                raise CommandError(form.errors.as_text())
+            lines = export_time_logs(project, chunk_size=options['chunk_size'], **form.cleaned_data)
+
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for line in lines:
+                output.write(line)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from main.fragments import fragment_stats, reset_fragment_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the hit and miss counters of the cached page fragments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after showing them.')
+
+    def handle(self, *args, **options):
+        for name, (hits, misses) in fragment_stats().items():
+            total = hits + misses
+            ratio = hits / total if total else 0
+            self.stdout.write(f'{name}: {hits} hit(s), {misses} miss(es), hit ratio {ratio:.1%}')
+
+        if options['reset']:
+            reset_fragment_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,80 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, connections
+
+from main.dataset import PASSWORD, DatasetGenerator
+
+# the generator of the worker processes, set once per process
+worker_generator = None
+
+
+def init_worker(generator):
+    global worker_generator
+    worker_generator = generator
+
+
+def create_chunk(number):
+    return worker_generator.create_chunk(number)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic dataset: users with employee profiles, projects with executor groups '
+        'and grants, tasks with their comments and time logs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--projects', type=int, default=5)
+        parser.add_argument('--tasks', type=int, default=10000, help='Tasks in total, spread over the projects.')
+        parser.add_argument('--comments-per-task', type=int, default=3)
+        parser.add_argument('--logs-per-task', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0, help='The same seed generates the same data.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Tasks per transaction.')
+        parser.add_argument('--workers', type=int, default=1, help='Processes creating the chunks (PostgreSQL).')
+        parser.add_argument('--prefix', default='user', help='Prefix of the user, group and project names.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['projects'] < 1 or options['projects'] > options['users']:
+            raise CommandError('Every project needs at least one user.')
+
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stderr.write('SQLite has a single writer, the chunks are created in one process.')
+            workers = 1
+
+        generator = DatasetGenerator(
+            users=options['users'], projects=options['projects'], tasks=options['tasks'],
+            comments_per_task=options['comments_per_task'], logs_per_task=options['logs_per_task'],
+            seed=options['seed'], chunk_size=options['chunk_size'], prefix=options['prefix'],
+        )
+
+        started = time.monotonic()
+        try:
+            generator.prepare()
+        except IntegrityError as error:
+            raise CommandError(f'{error}. Is there a dataset with the prefix "{options["prefix"]}" already?')
+        self.stdout.write(f'Created {generator.users} user(s) and {generator.projects} project(s).')
+
+        done = 0
+        if workers > 1:
+            # every process opens its own connection
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(workers, initializer=init_worker, initargs=(generator,)) as pool:
+                for count in pool.imap_unordered(create_chunk, generator.chunks):
+                    done += count
+                    self.stdout.write(f'{done}/{generator.tasks} task(s)')
+        else:
+            for number in generator.chunks:
+                done += generator.create_chunk(number)
+                self.stdout.write(f'{done}/{generator.tasks} task(s)')
+
+        generator.finish()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {done} task(s) in {time.monotonic() - started:.1f}s. '
+            f'The users log in with the password "{PASSWORD}".'
+        ))
@@ -0,0 +1,40 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from main.importers import IMPORT_FORMATS, TimeLogImporter
+
+
+class Command(BaseCommand):
+    help = 'Import time logs from a CSV or JSON Lines file in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS,
+            help='File format, guessed from the file extension by default.',
+        )
+        parser.add_argument('--author', help='Username for the rows without an author column.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError('Can not guess the file format, use --format.')
+
+        default_author = None
+        if options['author']:
+            default_author = User.objects.filter(username=options['author']).first()
+            if default_author is None:
+                raise CommandError(f'User "{options["author"]}" does not exist.')
+
+        importer = TimeLogImporter(default_author=default_author, batch_size=options['batch_size'])
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            for line_number, error in importer.import_stream(stream, file_format):
+                self.stderr.write(f'Line {line_number}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.imported} log(s), skipped {importer.failed} row(s).'
+        ))
@@ -0,0 +1,85 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from main.loadtest import run_load
+from main.models import Task
+from main.permissions import get_workable_projects
+
+
+def read_paths(user):
+    """The read views the async handlers serve: the index, a project, a task and its time logs."""
+    task = Task.objects.filter(project__unique_name__in=get_workable_projects(user)).order_by('id').first()
+    if task is None:
+        raise CommandError(f'{user} can not work on any task.')
+
+    project_name = task.project.unique_name
+    return [
+        reverse('index'),
+        reverse('main:project', args=[project_name]),
+        reverse('main:task', args=[project_name, task.id]),
+        reverse('main:time_loging', args=[project_name, task.id]),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load running servers (a WSGI and an ASGI one) with the read views and compare their '
+        'throughput and latency percentiles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True, metavar='NAME=URL',
+            help='A server to load, for example wsgi=http://127.0.0.1:8000. Repeat for every server.',
+        )
+        parser.add_argument('--user', required=True, help='The user the requests are made as.')
+        parser.add_argument('--concurrency', type=int, default=100, help='Connections kept busy at once.')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds of load per server.')
+        parser.add_argument('--warmup', type=float, default=2, help='Seconds of load before the measurement.')
+        parser.add_argument('--path', action='append', help='Paths to request instead of the read views.')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, separator, url = target.partition('=')
+            if not separator:
+                raise CommandError(f'--target must be NAME=URL, not {target}.')
+            targets.append((name, url))
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'There is no user {options["user"]}.')
+        paths = options['path'] or read_paths(user)
+
+        # a session of the user, as a log in would create it
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        headers = {'Cookie': f'{settings.SESSION_COOKIE_NAME}={session.session_key}'}
+
+        try:
+            results = []
+            for name, url in targets:
+                self.stdout.write(f'Loading {name} at {url}...')
+                if options['warmup']:
+                    run_load(name, url, paths, headers, options['concurrency'], options['warmup'])
+                results.append(run_load(name, url, paths, headers, options['concurrency'], options['duration']))
+        finally:
+            session.delete()
+
+        self.stdout.write(f'{"server":12} {"requests":>9} {"errors":>7} {"req/s":>9} {"p50 ms":>8} {"p99 ms":>8}')
+        for result in results:
+            summary = result.summary()
+            line = (
+                f'{result.name:12} {summary["requests"]:>9} {summary["errors"]:>7} {summary["rps"]:>9} '
+                f'{summary["p50"]:>8} {summary["p99"]:>8}'
+            )
+            self.stdout.write(self.style.ERROR(line) if summary['errors'] else line)
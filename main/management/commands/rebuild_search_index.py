@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of the tasks and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            tasks, comments = rebuild_index(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {tasks} task(s) and {comments} comment(s).'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main.rollups import iter_rollup_mismatches, rebuild_daily_rollups, rebuild_task_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-task time spent rollups from the time logs, or only verify them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='Only report rollups that disagree with the time logs; fail if there are any.',
+        )
+        parser.add_argument(
+            '--daily', action='store_true',
+            help='Also rebuild the daily rollups used by the time report from scratch.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        mismatches = 0
+
+        for task_id, stored, expected in iter_rollup_mismatches(options['chunk_size']):
+            mismatches += 1
+            if options['verify']:
+                self.stdout.write(f'Task {task_id}: stored {stored}, expected {expected}')
+            else:
+                with transaction.atomic():
+                    rebuild_task_rollup(task_id)
+
+        if options['verify']:
+            if mismatches:
+                raise CommandError(f'{mismatches} rollup(s) are out of date.')
+            self.stdout.write(self.style.SUCCESS('All rollups are up to date.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {mismatches} rollup(s).'))
+
+        if options['daily'] and not options['verify']:
+            with transaction.atomic():
+                created = rebuild_daily_rollups(options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} daily rollup(s).'))
@@ -0,0 +1,31 @@
+from django.db import transaction
+
+from accounts.models import Employee
+
+
+def sync_project_members(project, user_ids):
+    """
+    Make the project executors exactly `user_ids` with one bulk add, one bulk
+    remove and two bulk employee updates, whatever the number of users.
+    Superusers are never touched, they can not be chosen in the forms.
+    """
+    group = project.group_executors
+    desired = {int(user_id) for user_id in user_ids}
+
+    with transaction.atomic():
+        current = set(
+            group.user_set.exclude(username="AnonymousUser").filter(is_superuser=False).values_list('id', flat=True)
+        )
+
+        to_add = desired - current
+        if to_add:
+            group.user_set.add(*to_add)
+
+        to_remove = current - desired
+        if to_remove:
+            group.user_set.remove(*to_remove)
+
+        Employee.objects.filter(user_id__in=desired).exclude(project=project).update(project=project)
+        Employee.objects.filter(project=project).exclude(user_id__in=desired).update(project=None)
+
+    return to_add, to_remove
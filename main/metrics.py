@@ -0,0 +1,257 @@
+"""
+Request metrics in the Prometheus text format, served at /metrics/.
+
+MetricsMiddleware records for every url name the request latency (a
+histogram), the database queries and their time, the template render time and
+the response size. The counters are kept in memory by every process and
+written to its own file in METRICS_DIR every METRICS_FLUSH_INTERVAL seconds;
+the endpoint adds up the files of all the processes, so it does not matter
+which worker serves the scrape.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.template.backends import django as django_backend
+
+from .fragments import fragment_stats
+
+# upper bounds of the latency buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+UNRESOLVED = 'unresolved'
+
+# the timings of the request being served, see MetricsMiddleware
+current_request = ContextVar('current_request', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+
+
+def count_query(execute, sql, params, many, context):
+    # execute wrapper of every connection, see instrument(); the context
+    # variable follows the request into the threads of sync_to_async
+    timings = current_request.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.query_seconds += time.perf_counter() - start
+
+
+def instrument(connection):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def empty_view():
+    return {
+        'requests': {},
+        # per bucket, not cumulative; the last one is +Inf
+        'buckets': [0] * (len(BUCKETS) + 1),
+        'seconds': 0.0,
+        'queries': 0,
+        'query_seconds': 0.0,
+        'template_seconds': 0.0,
+        'bytes': 0,
+    }
+
+
+def bucket_index(seconds):
+    for index, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(BUCKETS)
+
+
+class Registry:
+    """The counters of this process, {url name: counters}."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def reset(self):
+        # a forked worker starts over with its own file
+        self.pid = os.getpid()
+        self.filename = f'{self.pid}-{uuid.uuid4().hex[:8]}.json'
+        self.views = {}
+        self.flushed = time.monotonic()
+
+    def _view(self, name):
+        if self.pid != os.getpid():
+            self.reset()
+        if name not in self.views:
+            self.views[name] = empty_view()
+        return self.views[name]
+
+    def observe(self, name, status, seconds, timings, size):
+        with self.lock:
+            view = self._view(name)
+            view['requests'][str(status)] = view['requests'].get(str(status), 0) + 1
+            view['buckets'][bucket_index(seconds)] += 1
+            view['seconds'] += seconds
+            view['queries'] += timings.queries
+            view['query_seconds'] += timings.query_seconds
+            view['template_seconds'] += timings.template_seconds
+            view['bytes'] += size
+            due = time.monotonic() - self.flushed >= settings.METRICS_FLUSH_INTERVAL
+
+        if due:
+            self.flush()
+
+    def add_bytes(self, name, size):
+        with self.lock:
+            self._view(name)['bytes'] += size
+
+    def flush(self):
+        with self.lock:
+            if self.pid != os.getpid():
+                self.reset()
+            self.flushed = time.monotonic()
+
+            directory = Path(settings.METRICS_DIR)
+            directory.mkdir(parents=True, exist_ok=True)
+            # replaced at once, a scrape never reads half a file
+            temporary = directory / f'.{self.filename}.tmp'
+            temporary.write_text(json.dumps(self.views))
+            os.replace(temporary, directory / self.filename)
+
+
+registry = Registry()
+
+
+@atexit.register
+def flush_at_exit():
+    # the requests since the last flush; processes that served none (management
+    # commands) leave no file
+    if registry.pid == os.getpid() and registry.views:
+        registry.flush()
+
+
+def merge(target, views):
+    for name, counters in views.items():
+        view = target.setdefault(name, empty_view())
+        for status, count in counters['requests'].items():
+            view['requests'][status] = view['requests'].get(status, 0) + count
+        view['buckets'] = [total + count for total, count in zip(view['buckets'], counters['buckets'])]
+        for key in ('seconds', 'queries', 'query_seconds', 'template_seconds', 'bytes'):
+            view[key] += counters[key]
+
+
+def collect():
+    """The counters of every process that has written its file, added up."""
+    registry.flush()
+
+    views = {}
+    for path in Path(settings.METRICS_DIR).glob('*.json'):
+        try:
+            merge(views, json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # removed by a cleanup since the glob
+            continue
+    return views
+
+
+def label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+def render_metrics(views, fragments=None):
+    lines = []
+
+    def metric(name, kind, description, samples):
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for suffix, labels, value in samples:
+            pairs = ','.join(f'{key}="{label(text)}"' for key, text in labels.items())
+            lines.append(f'{name}{suffix}{{{pairs}}} {number(value)}')
+
+    names = sorted(views)
+    metric('tracker_requests_total', 'counter', 'Requests served, by url name and status code.', [
+        ('', {'view': name, 'status': status}, count)
+        for name in names for status, count in sorted(views[name]['requests'].items())
+    ])
+
+    samples = []
+    for name in names:
+        view = views[name]
+        total = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), view['buckets']):
+            total += count
+            samples.append(('_bucket', {'view': name, 'le': bound}, total))
+        samples.append(('_sum', {'view': name}, view['seconds']))
+        samples.append(('_count', {'view': name}, total))
+    metric('tracker_request_duration_seconds', 'histogram', 'Time to the response, by url name.', samples)
+
+    for key, name, description in (
+        ('queries', 'tracker_db_queries_total', 'Database queries, by url name.'),
+        ('query_seconds', 'tracker_db_query_seconds_total', 'Time spent in database queries, by url name.'),
+        ('template_seconds', 'tracker_template_render_seconds_total', 'Time spent rendering templates, by url name.'),
+        ('bytes', 'tracker_response_bytes_total', 'Size of the response bodies, by url name.'),
+    ):
+        metric(name, 'counter', description, [('', {'view': view}, views[view][key]) for view in names])
+
+    if fragments is not None:
+        metric('tracker_fragment_cache_hits_total', 'counter', 'Cached page fragments found.', [
+            ('', {'fragment': name}, hits) for name, (hits, misses) in fragments.items()
+        ])
+        metric('tracker_fragment_cache_misses_total', 'counter', 'Cached page fragments rendered again.', [
+            ('', {'fragment': name}, misses) for name, (hits, misses) in fragments.items()
+        ])
+
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_text():
+    return render_metrics(collect(), fragment_stats())
+
+
+class Template:
+    """A template of the Django backend that adds its render time to the current request."""
+
+    def __init__(self, template):
+        self.template = template
+
+    @property
+    def origin(self):
+        return self.template.origin
+
+    def render(self, context=None, request=None):
+        timings = current_request.get()
+        if timings is None:
+            return self.template.render(context, request)
+
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            timings.template_seconds += time.perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """The Django template backend with timed templates (included templates are part of their parent)."""
+
+    def from_string(self, template_code):
+        return Template(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name))
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.utils.deprecation import MiddlewareMixin
+
+from .metrics import UNRESOLVED, RequestTimings, current_request, registry
+from .profiling import is_flagged, is_sampled, profile_request
+from .projects import get_project
+
+
+class ProjectMiddleware(MiddlewareMixin):
+    """
+    Resolve the project of every project scoped url once, as `request.project`.
+    Not for anonymous users: the views send them to log in first, whether the
+    project exists or not.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        project_name = view_kwargs.get('project_name')
+        if project_name is not None and request.user.is_authenticated:
+            request.project = get_project(project_name)
+
+
+class AsyncCapableMiddleware:
+    """
+    A middleware served in the mode of the handler: under ASGI the request
+    stays on the event loop instead of taking a thread for the rest of the chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # awaited by the handler, as MiddlewareMixin does it
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        return self.call(request)
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Record the latency, queries, template time and size of every response, see main.metrics."""
+
+    def call(self, request):
+        timings = RequestTimings()
+        token = current_request.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+        return self.observe(request, response, timings, time.perf_counter() - start)
+
+    async def acall(self, request):
+        timings = RequestTimings()
+        token = current_request.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+        return self.observe(request, response, timings, time.perf_counter() - start)
+
+    def observe(self, request, response, timings, seconds):
+        match = request.resolver_match
+        name = match.view_name if match else UNRESOLVED
+        if response.streaming:
+            # the body is only counted once it has been sent
+            response.streaming_content = self.count_bytes(name, response.streaming_content)
+            size = 0
+        else:
+            size = len(response.content)
+
+        registry.observe(name, response.status_code, seconds, timings, size)
+        return response
+
+    @staticmethod
+    def count_bytes(name, content):
+        size = 0
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+        registry.add_bytes(name, size)
+
+
+class ProfilerMiddleware(AsyncCapableMiddleware):
+    """Profile the requests asked for by a superuser or sampled, see main.profiling."""
+
+    def call(self, request):
+        requested = request.user.is_superuser if is_flagged(request) else is_sampled()
+        if not requested:
+            return self.get_response(request)
+
+        return profile_request(self.get_response, request)
+
+    async def acall(self, request):
+        if is_flagged(request):
+            # loading the user queries the session
+            requested = await sync_to_async(lambda: request.user.is_superuser, thread_sensitive=True)()
+        else:
+            requested = is_sampled()
+        if not requested:
+            return await self.get_response(request)
+
+        # the profiled thread waits for the view; the sync parts of the view
+        # (the database, cache and templates) come back to it and are profiled
+        return await sync_to_async(profile_request, thread_sensitive=True)(async_to_sync(self.respond), request)
+
+    async def respond(self, request):
+        return await self.get_response(request)
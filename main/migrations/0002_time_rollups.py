@@ -0,0 +1,59 @@
+# Generated by Django 3.2.4 on 2026-10-17 18:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeloging',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.AddField(
+            model_name='timeloging',
+            name='created',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='TaskTimeRollup',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='time_rollup', serialize=False, to='main.task')),
+                ('time_spent', models.IntegerField(default=0)),
+                ('log_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyTimeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('time_spent', models.IntegerField(default=0)),
+                ('log_count', models.IntegerField(default=0)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.task')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dailytimerollup',
+            index=models.Index(fields=['day', 'project'], name='daily_rollup_day_project'),
+        ),
+        migrations.AddIndex(
+            model_name='dailytimerollup',
+            index=models.Index(fields=['author', 'day'], name='daily_rollup_author_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailytimerollup',
+            constraint=models.UniqueConstraint(fields=('task', 'author', 'day'), name='unique_daily_time_rollup'),
+        ),
+    ]
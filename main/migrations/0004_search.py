@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    'CREATE VIRTUAL TABLE main_task_search USING fts5(topic, description)',
+    'CREATE VIRTUAL TABLE main_comment_search USING fts5(comment)',
+]
+
+POSTGRES_FORWARD = [
+    'CREATE TABLE main_task_search (task_id bigint PRIMARY KEY, document tsvector NOT NULL)',
+    'CREATE INDEX main_task_search_document ON main_task_search USING gin (document)',
+    'CREATE TABLE main_comment_search (comment_id bigint PRIMARY KEY, document tsvector NOT NULL)',
+    'CREATE INDEX main_comment_search_document ON main_comment_search USING gin (document)',
+]
+
+BACKWARD = [
+    'DROP TABLE main_task_search',
+    'DROP TABLE main_comment_search',
+]
+
+
+def create_search_tables(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = SQLITE_FORWARD if vendor == 'sqlite' else POSTGRES_FORWARD
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_tables(apps, schema_editor):
+    for sql in BACKWARD:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        # filled by the signals, existing rows by `manage.py rebuild_search_index`
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib.auth.models import User, Group
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 from tinymce.models import HTMLField
@@ -35,6 +36,12 @@ class TaskPriority(models.Model):
         return self.name
 
 
+class TaskQuerySet(models.QuerySet):
+    def for_list(self):
+        # everything the task list templates print, joined in one query
+        return self.select_related('type', 'priority', 'author', 'executor', 'project', 'time_rollup')
+
+
 class Task(models.Model):
     topic = models.CharField(max_length=200)
     description = models.TextField()
@@ -44,37 +51,98 @@ class Task(models.Model):
     priority = models.ForeignKey(TaskPriority, on_delete=models.PROTECT)
     estimated_time = models.IntegerField()
     executor = models.ForeignKey(
-        User, null=True, on_delete=models.SET_NULL, related_name="executor"
+        User, null=True, on_delete=models.SET_NULL, related_name="executor", db_index=False
     )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, editable=False, related_name="creator"
     )
     project = models.ForeignKey(
-        Project, on_delete=models.CASCADE, related_name="tasks"
+        Project, on_delete=models.CASCADE, related_name="tasks", db_index=False
     )
+    # bumped by every edit, an edit made against an older version is rejected
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     def __str__(self):
         return self.topic
 
     class Meta:
         ordering = ['id']
+        # the foreign keys are covered by the leading column of these
+        indexes = [
+            models.Index(fields=['project', 'id'], name='task_project_id_idx'),
+            models.Index(fields=['executor', 'finish_date'], name='task_executor_finish_idx'),
+        ]
+
+
+class TaskChange(models.Model):
+    # one changed field of one task edit; foreign keys are stored by id
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="changes", db_index=False)
+    editor = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
+    version = models.PositiveIntegerField()
+    field = models.CharField(max_length=50)
+    old_value = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    new_value = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['task', 'id'], name='task_change_task_id_idx'),
+        ]
+
+
+class TaskTimeRollup(models.Model):
+    task = models.OneToOneField(
+        Task, on_delete=models.CASCADE, primary_key=True, related_name="time_rollup"
+    )
+    time_spent = models.IntegerField(default=0)
+    log_count = models.IntegerField(default=0)
 
 
 class TimeLoging(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     time_spent = models.IntegerField()
     comment = models.CharField(max_length=500)
-    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="time_loging")
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="time_loging", db_index=False)
+    date = models.DateField(default=timezone.localdate)
+    created = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['id']
+        indexes = [
+            models.Index(fields=['task', 'id'], name='timelog_task_id_idx'),
+        ]
+
+
+class DailyTimeRollup(models.Model):
+    # hours logged by one author on one task in one day, for the reports
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    day = models.DateField()
+    time_spent = models.IntegerField(default=0)
+    log_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'author', 'day'], name='unique_daily_time_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'project'], name='daily_rollup_day_project'),
+            models.Index(fields=['author', 'day'], name='daily_rollup_author_day'),
+        ]
 
 
 class Comment(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     comment = models.CharField(max_length=600)
-    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments", db_index=False)
     created = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['id']
+        indexes = [
+            models.Index(fields=['task', 'created', 'id'], name='comment_task_created_idx'),
+        ]
@@ -0,0 +1,123 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def dump_cursor(data):
+    data = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def load_cursor(cursor):
+    """Return the data stored in `cursor`, or None when it can not be read."""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, TypeError, ValueError):
+        return None
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: every page is a seek on the ordering keys, so deep pages
+    cost the same as the first one and no COUNT(*) is issued.
+
+    `ordering` must end with a unique field (usually 'id').
+    """
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, ordering=('id',), per_page=None):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page or settings.PAGINATE_BY)
+        self.fields = [queryset.model._meta.get_field(name) for name in self.ordering]
+
+    def encode_cursor(self, direction, obj):
+        values = []
+        for name in self.ordering:
+            # model instances, or the dicts of a values() queryset
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+
+        return dump_cursor([direction, values])
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, values = load_cursor(cursor)
+            if direction not in (self.NEXT, self.PREVIOUS) or len(values) != len(self.ordering):
+                return None
+            values = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+        return direction, values
+
+    def _seek(self, values, lookup):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for previous, value in zip(self.ordering[:index], values[:index]):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def get_page(self, cursor=None):
+        """Return the page for `cursor`; an invalid or empty cursor gives the first page."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+
+        if decoded is None:
+            direction, queryset = self.NEXT, self.queryset.order_by(*self.ordering)
+        else:
+            direction, values = decoded
+            if direction == self.NEXT:
+                queryset = self.queryset.filter(self._seek(values, 'gt')).order_by(*self.ordering)
+            else:
+                queryset = self.queryset.filter(self._seek(values, 'lt')).order_by(
+                    *[f'-{name}' for name in self.ordering]
+                )
+
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if direction == self.PREVIOUS:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, decoded is not None
+
+        next_cursor = previous_cursor = None
+        if object_list:
+            if has_next:
+                next_cursor = self.encode_cursor(self.NEXT, object_list[-1])
+            if has_previous:
+                previous_cursor = self.encode_cursor(self.PREVIOUS, object_list[0])
+
+        return CursorPage(object_list, next_cursor, previous_cursor)
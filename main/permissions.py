@@ -0,0 +1,62 @@
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponseForbidden
+from guardian.shortcuts import get_objects_for_user
+
+from .models import Project
+
+PERMISSIONS_VERSION_KEY = 'permissions:work_on_project:version'
+PERMISSIONS_TIMEOUT = 60 * 60 * 24
+
+
+def permissions_version():
+    version = cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        cache.add(PERMISSIONS_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(PERMISSIONS_VERSION_KEY)
+    return version
+
+
+def invalidate_permissions():
+    # grants change rarely, so any change simply starts a new set of keys for every user;
+    # after the commit, so a concurrent request can not cache the old grants under the new version
+    transaction.on_commit(lambda: cache.set(PERMISSIONS_VERSION_KEY, uuid.uuid4().hex, None))
+
+
+def get_workable_projects(user):
+    """Unique names of the projects `user` can work on, loaded once per request and cached across requests."""
+    names = getattr(user, '_workable_projects', None)
+    if names is not None:
+        return names
+
+    key = f'permissions:work_on_project:{user.pk}:{permissions_version()}'
+    names = cache.get(key)
+    if names is None:
+        names = frozenset(
+            get_objects_for_user(
+                user, 'main.work_on_project', klass=Project, accept_global_perms=False
+            ).values_list('unique_name', flat=True)
+        )
+        cache.set(key, names, PERMISSIONS_TIMEOUT)
+
+    user._workable_projects = names
+    return names
+
+
+def can_work_on_project(user, project):
+    return user.is_superuser or project.unique_name in get_workable_projects(user)
+
+
+def work_on_project_required(view):
+    # request.project is resolved by main.middleware.ProjectMiddleware
+    @wraps(view)
+    def wrapper(request, project_name, *args, **kwargs):
+        if not can_work_on_project(request.user, request.project):
+            return HttpResponseForbidden()
+
+        return view(request, project_name, *args, **kwargs)
+
+    return wrapper
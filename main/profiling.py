@@ -0,0 +1,139 @@
+"""
+Profiles of single requests, see ProfilerMiddleware.
+
+A request is profiled when a superuser asks for it with the X-Profile header
+or the `profile` query parameter, or when it is sampled (one in
+PROFILE_SAMPLE_RATE requests). The cProfile stats are written to
+PROFILE_DIR as <name>.prof (for pstats or snakeviz), next to <name>.json with
+the request, its SQL and the top frames; only the newest PROFILE_KEEP profiles
+are kept.
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAMETER = 'profile'
+
+# frames shown for every profile
+TOP_FRAMES = 20
+
+
+def is_flagged(request):
+    # only honoured for superusers, checked by the middleware
+    return bool(request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAMETER))
+
+
+def is_sampled():
+    rate = settings.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.randrange(rate) == 0
+
+
+def profile_request(get_response, request):
+    profiler = cProfile.Profile()
+    queries = []
+
+    def log_query(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            # without the parameters, they can be passwords or personal data
+            queries.append({'sql': sql, 'many': many, 'seconds': time.perf_counter() - start})
+
+    start = time.perf_counter()
+    with connection.execute_wrapper(log_query):
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is running in this thread
+            return get_response(request)
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+
+    save_profile(request, response, profiler, queries, time.perf_counter() - start)
+    return response
+
+
+def short_path(filename):
+    base = str(settings.BASE_DIR)
+    if filename.startswith(base):
+        return os.path.relpath(filename, base)
+    if 'site-packages' in filename:
+        return filename.split('site-packages' + os.sep, 1)[-1]
+    return filename
+
+
+def frame_name(frame):
+    filename, line, function = frame
+    if filename == '~':
+        # built-in functions
+        return function
+    return f'{short_path(filename)}:{line}({function})'
+
+
+def top_frames(stats, sort):
+    column = {'self': 2, 'cumulative': 3}[sort]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:TOP_FRAMES]
+    return [
+        {'function': frame_name(frame), 'calls': calls, 'self': self_time, 'cumulative': cumulative}
+        for frame, (primitive_calls, calls, self_time, cumulative, callers) in rows
+    ]
+
+
+def save_profile(request, response, profiler, queries, seconds):
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    # sorted by name is sorted by time
+    name = f'{timezone.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}'
+
+    profiler.dump_stats(directory / f'{name}.prof')
+    stats = pstats.Stats(profiler)
+    user = getattr(request, 'user', None)
+    match = request.resolver_match
+
+    (directory / f'{name}.json').write_text(json.dumps({
+        'name': name,
+        'created': timezone.now().isoformat(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': match.view_name if match else None,
+        'user': user.get_username() if user is not None and user.is_authenticated else None,
+        'status': response.status_code,
+        'seconds': seconds,
+        'sql_seconds': sum(query['seconds'] for query in queries),
+        'queries': queries,
+        'top_cumulative': top_frames(stats, 'cumulative'),
+        'top_self': top_frames(stats, 'self'),
+    }))
+
+    rotate(directory)
+
+
+def rotate(directory):
+    for path in sorted(directory.glob('*.json'), reverse=True)[settings.PROFILE_KEEP:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def list_profiles():
+    """The saved profiles, newest first."""
+    profiles = []
+    for path in sorted(Path(settings.PROFILE_DIR).glob('*.json'), reverse=True):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # rotated away since the glob
+            continue
+    return profiles
@@ -0,0 +1,36 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+from .models import Project
+
+PROJECTS_VERSION_KEY = 'projects:version'
+PROJECT_TIMEOUT = 60 * 60
+
+
+def projects_version():
+    version = cache.get(PROJECTS_VERSION_KEY)
+    if version is None:
+        cache.add(PROJECTS_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(PROJECTS_VERSION_KEY)
+    return version
+
+
+def invalidate_projects():
+    # after the commit, as invalidate_permissions
+    transaction.on_commit(lambda: cache.set(PROJECTS_VERSION_KEY, uuid.uuid4().hex, None))
+
+
+def get_project(unique_name):
+    """The project with its executor group, read through the cache."""
+    key = f'projects:{projects_version()}:{unique_name}'
+    project = cache.get(key)
+    if project is None:
+        project = Project.objects.select_related('group_executors').filter(unique_name=unique_name).first()
+        if project is None:
+            raise Http404(f'Project "{unique_name}" does not exist.')
+        cache.set(key, project, PROJECT_TIMEOUT)
+
+    return project
@@ -0,0 +1,58 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import TaskType, TaskPriority
+
+
+class ReferenceCache:
+    """
+    In-process copy of a small table that almost never changes.
+
+    Every worker keeps its own copy together with the version it was loaded
+    at. The current version lives in the configured cache backend and is
+    replaced on every write (see signals), so a lookup costs one cache read
+    and no queries until some worker changes the table.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f'reference:{model._meta.label_lower}:version'
+        self._version = None
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def invalidate(self):
+        # after the commit, so another worker can not load the old rows under the new version
+        transaction.on_commit(lambda: cache.set(self.version_key, uuid.uuid4().hex, None))
+
+    def _load(self):
+        version = self.current_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._objects = {obj.pk: obj for obj in self.model.objects.order_by('pk')}
+                    self._version = version
+        return self._objects
+
+    def all(self):
+        return list(self._load().values())
+
+    def get(self, pk):
+        try:
+            return self._load()[int(pk)]
+        except (KeyError, TypeError, ValueError):
+            raise self.model.DoesNotExist(f'{self.model.__name__} with pk {pk!r} does not exist.')
+
+
+task_types = ReferenceCache(TaskType)
+task_priorities = ReferenceCache(TaskPriority)
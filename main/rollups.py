@@ -0,0 +1,149 @@
+from collections import defaultdict, namedtuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from . import fragments
+from .models import Task, TaskTimeRollup, DailyTimeRollup, TimeLoging
+
+# what a time log contributes to the rollups
+LoggedTime = namedtuple('LoggedTime', 'project_id task_id author_id date time_spent')
+
+
+def logged_time(log):
+    return LoggedTime(log.task.project_id, log.task_id, log.author_id, log.date, log.time_spent)
+
+
+def stored_logged_time(log_id):
+    row = TimeLoging.objects.filter(pk=log_id).values_list(
+        'task__project_id', 'task_id', 'author_id', 'date', 'time_spent'
+    ).first()
+    return LoggedTime(*row) if row else None
+
+
+def apply_logged_time(changes, rebuild_missing=True):
+    """
+    Apply (LoggedTime, sign) pairs to the task and daily rollups, one update
+    per task and per (task, author, day). Must run in a transaction.
+    """
+    tasks = defaultdict(lambda: [0, 0])
+    days = defaultdict(lambda: [0, 0])
+    for entry, sign in changes:
+        for totals in (tasks[entry.task_id], days[entry.project_id, entry.task_id, entry.author_id, entry.date]):
+            totals[0] += sign * entry.time_spent
+            totals[1] += sign
+
+    for task_id, (time_spent, log_count) in tasks.items():
+        if time_spent or log_count:
+            add_time_spent(task_id, time_spent, log_count, rebuild_missing)
+
+    for key, (time_spent, log_count) in days.items():
+        if time_spent or log_count:
+            add_daily_time_spent(*key, time_spent, log_count)
+
+    # the task lists print the time spent
+    project_ids = {entry.project_id for entry, sign in changes}
+    if project_ids:
+        fragments.bump('project', *project_ids)
+
+
+def add_time_spent(task_id, time_spent, log_count, rebuild_missing=True):
+    updated = TaskTimeRollup.objects.filter(task_id=task_id).update(
+        time_spent=F('time_spent') + time_spent,
+        log_count=F('log_count') + log_count,
+    )
+    # tasks created before the rollup existed get their row on first write
+    if not updated and rebuild_missing:
+        rebuild_task_rollup(task_id)
+
+
+def add_daily_time_spent(project_id, task_id, author_id, day, time_spent, log_count):
+    rows = DailyTimeRollup.objects.filter(task_id=task_id, author_id=author_id, day=day)
+    changes = {'time_spent': F('time_spent') + time_spent, 'log_count': F('log_count') + log_count}
+
+    if not rows.update(**changes) and log_count > 0:
+        try:
+            with transaction.atomic():
+                DailyTimeRollup.objects.create(
+                    project_id=project_id, task_id=task_id, author_id=author_id, day=day,
+                    time_spent=time_spent, log_count=log_count,
+                )
+        except IntegrityError:
+            # created by a concurrent write in the meantime
+            rows.update(**changes)
+
+
+def rebuild_task_rollup(task_id):
+    totals = TimeLoging.objects.filter(task_id=task_id).aggregate(
+        time_spent=Sum('time_spent'), log_count=Count('id')
+    )
+    rollup, _ = TaskTimeRollup.objects.update_or_create(
+        task_id=task_id,
+        defaults={
+            'time_spent': totals['time_spent'] or 0,
+            'log_count': totals['log_count'],
+        },
+    )
+    return rollup
+
+
+def get_task_rollup(task):
+    try:
+        return task.time_rollup
+    except TaskTimeRollup.DoesNotExist:
+        with transaction.atomic():
+            return rebuild_task_rollup(task.pk)
+
+
+def iter_rollup_mismatches(chunk_size=1000):
+    """Yield (task_id, stored, expected) for every rollup that disagrees with the logs."""
+    task_ids = Task.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=chunk_size)
+
+    chunk = []
+    for task_id in task_ids:
+        chunk.append(task_id)
+        if len(chunk) == chunk_size:
+            yield from _chunk_mismatches(chunk)
+            chunk = []
+    if chunk:
+        yield from _chunk_mismatches(chunk)
+
+
+def _chunk_mismatches(task_ids):
+    expected = {
+        row['task_id']: (row['time_spent'], row['log_count'])
+        for row in TimeLoging.objects.filter(task_id__in=task_ids).order_by().values('task_id').annotate(
+            time_spent=Sum('time_spent'), log_count=Count('id')
+        )
+    }
+    stored = {
+        row['task_id']: (row['time_spent'], row['log_count'])
+        for row in TaskTimeRollup.objects.filter(task_id__in=task_ids).values('task_id', 'time_spent', 'log_count')
+    }
+
+    for task_id in task_ids:
+        if stored.get(task_id) != expected.get(task_id, (0, 0)):
+            yield task_id, stored.get(task_id), expected.get(task_id, (0, 0))
+
+
+def rebuild_daily_rollups(chunk_size=1000):
+    DailyTimeRollup.objects.all().delete()
+
+    rows = TimeLoging.objects.order_by().values('task__project_id', 'task_id', 'author_id', 'date').annotate(
+        time_spent=Sum('time_spent'), log_count=Count('id')
+    ).iterator(chunk_size=chunk_size)
+
+    batch = []
+    created = 0
+    for row in rows:
+        batch.append(DailyTimeRollup(
+            project_id=row['task__project_id'], task_id=row['task_id'], author_id=row['author_id'],
+            day=row['date'], time_spent=row['time_spent'], log_count=row['log_count'],
+        ))
+        if len(batch) == chunk_size:
+            DailyTimeRollup.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    DailyTimeRollup.objects.bulk_create(batch)
+
+    return created + len(batch)
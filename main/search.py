@@ -0,0 +1,256 @@
+"""
+Full-text search over task topics, descriptions and comments.
+
+The documents live in shadow tables kept in sync by the signals: FTS5 tables
+on SQLite, tables with a GIN indexed tsvector on PostgreSQL. Both are created
+by the 0004_search migration and refilled by `manage.py rebuild_search_index`.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import strip_tags
+
+from .models import Comment, Task
+from .pagination import CursorPage, dump_cursor, load_cursor
+
+# how much a match in a comment counts next to the same match in the task itself
+COMMENT_WEIGHT = 0.5
+
+
+class SqliteSearch:
+    upsert_task = [
+        'DELETE FROM main_task_search WHERE rowid = %s',
+        'INSERT INTO main_task_search (rowid, topic, description) VALUES (%s, %s, %s)',
+    ]
+    upsert_comment = [
+        'DELETE FROM main_comment_search WHERE rowid = %s',
+        'INSERT INTO main_comment_search (rowid, comment) VALUES (%s, %s)',
+    ]
+    delete_task = 'DELETE FROM main_task_search WHERE rowid = %s'
+    delete_comment = 'DELETE FROM main_comment_search WHERE rowid = %s'
+    clear = ['DELETE FROM main_task_search', 'DELETE FROM main_comment_search']
+
+    # bm25() is lower for better matches, the topic counts twice
+    matches = f'''
+        SELECT rowid AS task_id, -bm25(main_task_search, 2.0, 1.0) AS score
+        FROM main_task_search WHERE main_task_search MATCH %s
+        UNION ALL
+        SELECT c.task_id, -bm25(main_comment_search) * {COMMENT_WEIGHT}
+        FROM main_comment_search INNER JOIN main_comment c ON c.id = main_comment_search.rowid
+        WHERE main_comment_search MATCH %s
+    '''
+
+    def upsert_task_params(self, task):
+        return [[task.pk], [task.pk, task.topic, strip_tags(task.description)]]
+
+    def upsert_comment_params(self, comment):
+        return [[comment.pk], [comment.pk, comment.comment]]
+
+    def match_params(self, text):
+        # every word must match; quoting keeps the FTS5 query syntax out of the user input
+        words = re.findall(r'\w+', text)
+        if not words:
+            return None
+        expression = ' '.join(f'"{word}"' for word in words)
+        return [expression, expression]
+
+
+class PostgresSearch:
+    upsert_task = [
+        '''
+        INSERT INTO main_task_search (task_id, document)
+        VALUES (%s, setweight(to_tsvector(%s, %s), 'A') || setweight(to_tsvector(%s, %s), 'B'))
+        ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document
+        ''',
+    ]
+    upsert_comment = [
+        '''
+        INSERT INTO main_comment_search (comment_id, document) VALUES (%s, to_tsvector(%s, %s))
+        ON CONFLICT (comment_id) DO UPDATE SET document = EXCLUDED.document
+        ''',
+    ]
+    delete_task = 'DELETE FROM main_task_search WHERE task_id = %s'
+    delete_comment = 'DELETE FROM main_comment_search WHERE comment_id = %s'
+    clear = ['TRUNCATE main_task_search, main_comment_search']
+
+    matches = f'''
+        SELECT s.task_id, ts_rank(s.document, q)::float8 AS score
+        FROM main_task_search s CROSS JOIN plainto_tsquery(%s, %s) q
+        WHERE s.document @@ q
+        UNION ALL
+        SELECT c.task_id, ts_rank(s.document, q)::float8 * {COMMENT_WEIGHT}
+        FROM main_comment_search s
+        INNER JOIN main_comment c ON c.id = s.comment_id
+        CROSS JOIN plainto_tsquery(%s, %s) q
+        WHERE s.document @@ q
+    '''
+
+    def upsert_task_params(self, task):
+        config = settings.SEARCH_CONFIG
+        return [[task.pk, config, task.topic, config, strip_tags(task.description)]]
+
+    def upsert_comment_params(self, comment):
+        return [[comment.pk, settings.SEARCH_CONFIG, comment.comment]]
+
+    def match_params(self, text):
+        if not text.strip():
+            return None
+        return [settings.SEARCH_CONFIG, text, settings.SEARCH_CONFIG, text]
+
+
+BACKENDS = {
+    'sqlite': SqliteSearch(),
+    'postgresql': PostgresSearch(),
+}
+
+
+def get_backend():
+    return BACKENDS[connection.vendor]
+
+
+def _execute(statements, params_list):
+    with connection.cursor() as cursor:
+        for sql, params in zip(statements, params_list):
+            cursor.execute(sql, params)
+
+
+def _execute_for_each(statements, objects_params):
+    # objects_params holds the params of every statement for each object
+    if not objects_params:
+        return
+    with connection.cursor() as cursor:
+        for position, sql in enumerate(statements):
+            cursor.executemany(sql, [params[position] for params in objects_params])
+
+
+def index_tasks(tasks):
+    backend = get_backend()
+    _execute_for_each(backend.upsert_task, [backend.upsert_task_params(task) for task in tasks])
+
+
+def index_comments(comments):
+    backend = get_backend()
+    _execute_for_each(backend.upsert_comment, [backend.upsert_comment_params(comment) for comment in comments])
+
+
+def index_task(task):
+    index_tasks([task])
+
+
+def index_comment(comment):
+    index_comments([comment])
+
+
+def remove_task(task_id):
+    _execute([get_backend().delete_task], [[task_id]])
+
+
+def remove_comment(comment_id):
+    _execute([get_backend().delete_comment], [[comment_id]])
+
+
+def rebuild_index(chunk_size=1000):
+    backend = get_backend()
+    _execute(backend.clear, [[]] * len(backend.clear))
+
+    counts = []
+    for queryset, index in (
+        (Task.objects.only('topic', 'description'), index_tasks),
+        (Comment.objects.only('comment'), index_comments),
+    ):
+        count = 0
+        chunk = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                index(chunk)
+                count += len(chunk)
+                chunk = []
+        index(chunk)
+        counts.append(count + len(chunk))
+
+    return tuple(counts)
+
+
+def search_tasks(text, project_ids=None, seek=None, reverse=False, limit=10):
+    """
+    Return (task_id, score) pairs matching `text`, best first. `project_ids`
+    limits the projects searched, `seek` is the (score, task_id) pair the
+    page starts after; with `reverse` the page before it, worst first.
+    """
+    backend = get_backend()
+    params = backend.match_params(text)
+    if params is None or project_ids is not None and not project_ids:
+        return []
+
+    where = having = ''
+    if project_ids is not None:
+        where = f'WHERE t.project_id IN ({", ".join(["%s"] * len(project_ids))})'
+        params += list(project_ids)
+    if seek is not None:
+        score_op, id_op = ('>', '<') if reverse else ('<', '>')
+        having = f'HAVING MAX(matches.score) {score_op} %s OR (MAX(matches.score) = %s AND matches.task_id {id_op} %s)'
+        params += [seek[0], seek[0], seek[1]]
+    order = 'score ASC, matches.task_id DESC' if reverse else 'score DESC, matches.task_id ASC'
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'''
+            SELECT matches.task_id, MAX(matches.score) AS score
+            FROM ({backend.matches}) matches
+            INNER JOIN main_task t ON t.id = matches.task_id
+            {where}
+            GROUP BY matches.task_id
+            {having}
+            ORDER BY {order}
+            LIMIT %s
+        ''', params + [limit])
+        return cursor.fetchall()
+
+
+class TaskSearchPaginator:
+    """Keyset pagination over ranked search results, with the same pages as CursorPaginator."""
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, text, project_ids=None, per_page=None):
+        self.text = text
+        self.project_ids = project_ids
+        self.per_page = int(per_page or settings.PAGINATE_BY)
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, (score, task_id) = load_cursor(cursor)
+            if direction not in (self.NEXT, self.PREVIOUS):
+                return None
+            return direction, (float(score), int(task_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_page(self, cursor=None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        direction, seek = decoded or (self.NEXT, None)
+
+        rows = search_tasks(
+            self.text, self.project_ids, seek, reverse=direction == self.PREVIOUS, limit=self.per_page + 1
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == self.PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, decoded is not None
+
+        tasks = Task.objects.for_list().in_bulk([task_id for task_id, score in rows])
+        object_list = [tasks[task_id] for task_id, score in rows if task_id in tasks]
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = dump_cursor([self.NEXT, [rows[-1][1], rows[-1][0]]])
+            if has_previous:
+                previous_cursor = dump_cursor([self.PREVIOUS, [rows[0][1], rows[0][0]]])
+
+        return CursorPage(object_list, next_cursor, previous_cursor)
@@ -0,0 +1,167 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from guardian.models import GroupObjectPermission, UserObjectPermission
+
+from .choices import WORKER_CHOICES_KEY
+from . import fragments, metrics, search
+from .history import changes_of_save
+from .models import Project, TaskType, TaskPriority, Task, TaskChange, TaskTimeRollup, TimeLoging, Comment
+from .permissions import invalidate_permissions
+from .projects import invalidate_projects
+from .reference import task_types, task_priorities
+from .rollups import apply_logged_time, logged_time, stored_logged_time
+
+
+@receiver(post_save, sender=Task)
+def create_time_rollup(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TaskTimeRollup.objects.create(task=instance)
+
+
+@receiver(pre_save, sender=Task)
+def version_task_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # update_task writes with update(), every other save of a stored task is versioned here
+    if raw or instance.pk is None:
+        return
+    instance._task_changes = changes_of_save(instance, getattr(instance, '_editor', None), update_fields)
+
+
+@receiver(post_save, sender=Task)
+def record_task_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    changes = instance.__dict__.pop('_task_changes', None)
+    if changes is None:
+        return
+
+    if update_fields is not None and 'version' not in update_fields:
+        Task.objects.filter(pk=instance.pk).update(version=instance.version)
+    TaskChange.objects.bulk_create(changes)
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields is not None and not {'topic', 'description'} & set(update_fields):
+        return
+    search.index_task(instance)
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, **kwargs):
+    search.remove_task(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.remove_comment(instance.pk)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def bump_task_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fragments.bump('project', instance.project_id)
+        fragments.bump('task', instance.pk)
+
+
+@receiver(post_save, sender=Project)
+def bump_project_fragments(sender, instance, raw=False, **kwargs):
+    # the task list prints the project title
+    if not raw:
+        fragments.bump('project', instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fragments.bump('task', instance.task_id)
+
+
+@receiver(pre_save, sender=TimeLoging)
+@receiver(pre_delete, sender=TimeLoging)
+def remember_logged_time(sender, instance, raw=False, **kwargs):
+    # the stored values, the instance itself may be stale
+    instance._logged_before = None
+    if instance.pk and not raw:
+        instance._logged_before = stored_logged_time(instance.pk)
+
+
+@receiver(post_save, sender=TimeLoging)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    changes = [(logged_time(instance), 1)]
+    previous = getattr(instance, '_logged_before', None)
+    if previous is not None:
+        changes.append((previous, -1))
+
+    with transaction.atomic():
+        apply_logged_time(changes)
+
+
+@receiver(post_delete, sender=TimeLoging)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    previous = getattr(instance, '_logged_before', None)
+    if previous is not None:
+        # the rollups may already be gone when the whole task is being deleted
+        with transaction.atomic():
+            apply_logged_time([(previous, -1)], rebuild_missing=False)
+
+
+@receiver(post_save, sender=TaskType)
+@receiver(post_delete, sender=TaskType)
+def invalidate_task_types(sender, **kwargs):
+    task_types.invalidate()
+
+
+@receiver(post_save, sender=TaskPriority)
+@receiver(post_delete, sender=TaskPriority)
+def invalidate_task_priorities(sender, **kwargs):
+    task_priorities.invalidate()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_worker_choices(sender, update_fields=None, **kwargs):
+    # logging in only updates last_login
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    # after the commit, a list rebuilt before it would be cached without expiry
+    transaction.on_commit(lambda: cache.delete(WORKER_CHOICES_KEY))
+
+
+@receiver(post_save, sender=UserObjectPermission)
+@receiver(post_delete, sender=UserObjectPermission)
+@receiver(post_save, sender=GroupObjectPermission)
+@receiver(post_delete, sender=GroupObjectPermission)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_permissions_on_grant_change(sender, **kwargs):
+    invalidate_permissions()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_permissions_on_membership_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_permissions()
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_cached_projects(sender, **kwargs):
+    invalidate_projects()
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    metrics.instrument(connection)
@@ -0,0 +1,175 @@
+"""
+Production static files.
+
+CompressedManifestStaticFilesStorage stores the files under hashed names (see
+ManifestStaticFilesStorage) and writes .gz and .br variants of the text ones
+at collectstatic time. PrecompressedStaticFiles is a WSGI wrapper serving
+STATIC_ROOT from a table built at startup: the best variant the client
+accepts, with far-future cache headers for the hashed names, without ever
+reaching Django.
+"""
+import gzip
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from pathlib import Path
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml', '.html', '.ttf', '.eot')
+
+# smaller files are sent as they are
+MIN_COMPRESS_SIZE = 256
+
+# extension of the variant -> Content-Encoding, in order of preference
+ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# the names without a hash can change on the next deploy
+CACHE_CONTROL = 'public, max-age=60'
+
+BLOCK_SIZE = 64 * 1024
+
+
+def compress(data):
+    """{variant extension: compressed data} of the variants worth keeping."""
+    variants = {
+        '.br': brotli.compress(data, quality=11),
+        '.gz': gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    return {extension: variant for extension, variant in variants.items() if len(variant) < len(data) * 0.95}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        # only the hashed names are referenced by the pages
+        for name in sorted(set(self.hashed_files.values())):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS) or self.size(name) < MIN_COMPRESS_SIZE:
+                continue
+
+            with self.open(name) as file:
+                data = file.read()
+            for extension, variant in compress(data).items():
+                path = Path(self.path(name + extension))
+                # the hashed name changes with the content, a variant never goes stale
+                if not path.exists():
+                    path.write_bytes(variant)
+                yield name, name + extension, True
+
+
+def accepted_encodings(header):
+    encodings = set()
+    for item in header.split(','):
+        name, _, parameters = item.strip().partition(';')
+        quality = parameters.strip()
+        if quality.startswith('q=') and quality[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        stat = path.stat()
+        content_type, _ = mimetypes.guess_type(path.name)
+        content_type = content_type or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+
+        self.headers = [
+            ('Content-Type', content_type),
+            ('Cache-Control', IMMUTABLE_CACHE_CONTROL if immutable else CACHE_CONTROL),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+        ]
+        self.version = f'{stat.st_size:x}-{int(stat.st_mtime):x}'
+        # (Content-Encoding, path, size), the plain file last
+        self.variants = [
+            (encoding, variant, variant.stat().st_size)
+            for extension, encoding in ENCODINGS
+            for variant in [path.with_name(path.name + extension)] if variant.exists()
+        ] + [(None, path, stat.st_size)]
+        if len(self.variants) > 1:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+
+    def variant(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding) if accept_encoding else set()
+        for encoding, path, size in self.variants:
+            if encoding is None or encoding in accepted:
+                return encoding, path, size
+
+
+def scan(root):
+    """{path below root: StaticFile} of the collected files."""
+    root = Path(root)
+    manifest = root / 'staticfiles.json'
+    hashed = set(json.loads(manifest.read_text())['paths'].values()) if manifest.exists() else set()
+    variant_extensions = tuple(extension for extension, encoding in ENCODINGS)
+
+    files = {}
+    for path in root.rglob('*'):
+        if path.is_file() and not path.name.endswith(variant_extensions):
+            name = path.relative_to(root).as_posix()
+            files[name] = StaticFile(path, immutable=name in hashed)
+    return files
+
+
+class PrecompressedStaticFiles:
+    """WSGI application serving `root` at `prefix`, passing every other request on to `application`."""
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.prefix = prefix
+        self.files = scan(root)
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+
+        static_file = self.files.get(path[len(self.prefix):])
+        if static_file is None or environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('404 Not Found', [('Content-Type', 'text/plain'), ('Content-Length', '9')])
+            return [b'Not Found']
+
+        encoding, file_path, size = static_file.variant(environ.get('HTTP_ACCEPT_ENCODING'))
+        # every variant is a representation of its own
+        etag = f'"{static_file.version}-{encoding}"' if encoding else f'"{static_file.version}"'
+        headers = static_file.headers + [('ETag', etag)]
+        if etag in environ.get('HTTP_IF_NONE_MATCH', ''):
+            start_response('304 Not Modified', headers)
+            return []
+
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(size)))
+        start_response('200 OK', headers)
+
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file = open(file_path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper:
+            return file_wrapper(file, BLOCK_SIZE)
+        return read_blocks(file)
+
+
+def read_blocks(file):
+    with file:
+        while True:
+            block = file.read(BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+
+
+def static_application(application, settings):
+    """`application` with the collected static files in front of it, when there is a STATIC_ROOT."""
+    if not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+        return application
+    return PrecompressedStaticFiles(application, settings.STATIC_ROOT, settings.STATIC_URL)
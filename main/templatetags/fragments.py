@@ -0,0 +1,55 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from main.fragments import FRAGMENT_NAMES, record
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not self.vary_on[0].resolve(context):
+            return self.nodelist.render(context)
+
+        vary_on = [str(value.resolve(context)) for value in self.vary_on] + [get_language() or '']
+        digest = hashlib.md5(':'.join(vary_on).encode()).hexdigest()
+        key = f'fragments:{self.name}:{digest}'
+
+        content = cache.get(key)
+        record(self.name, content is not None)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, settings.FRAGMENT_CACHE_TIMEOUT)
+        return content
+
+
+@register.tag('fragment_cache')
+def do_fragment_cache(parser, token):
+    """
+    {% fragment_cache 'name' version [vary_on ...] %} ... {% endfragment_cache %}
+
+    Caches the rendered content per name, vary_on values and active language.
+    `version` should change whenever anything the content shows changes; an
+    empty version renders the content without the cache.
+    """
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a name and a version.")
+
+    name = bits[1].strip('\'"')
+    if name not in FRAGMENT_NAMES:
+        raise template.TemplateSyntaxError(f"Unknown fragment '{name}', add it to main.fragments.FRAGMENT_NAMES.")
+
+    return FragmentCacheNode(nodelist, name, [parser.compile_filter(bit) for bit in bits[2:]])
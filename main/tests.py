@@ -1,3 +1,1288 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import datetime
+import importlib
+import json
+import os
+import sys
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+import brotli
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User, Group
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, resolve, reverse
+from django.utils import timezone
+from guardian.shortcuts import assign_perm
+
+from accounts.models import Employee, Position
+from tracker.asgi import TrackerASGIHandler
+
+from .benchmark import SCENARIOS, check, load_budgets, url_names
+from .choices import WORKER_CHOICES_KEY, task_type_choices, worker_choices
+from .dataset import DatasetGenerator
+from .loadtest import apply_load
+from .fragments import fragment_stats
+from .history import change_notification_text
+from .metrics import empty_view, registry
+from .models import (
+    Project, TaskType, TaskPriority, Task, TaskChange, TaskTimeRollup, DailyTimeRollup, Comment, TimeLoging,
+)
+from .pagination import CursorPaginator
+from .permissions import get_workable_projects
+from .profiling import list_profiles
+from .rollups import iter_rollup_mismatches
+from .search import search_tasks
+from .staticfiles import PrecompressedStaticFiles
+from .reference import task_types
+
+
+class TrackerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.worker = User.objects.create_user('worker', 'worker@example.com', 'password')
+
+        group_executors = Group.objects.create(name='tracker')
+        group_executors.user_set.add(cls.worker)
+        cls.project = Project.objects.create(
+            title='Tracker',
+            description='Time tracker',
+            unique_name='tracker',
+            group_executors=group_executors,
+        )
+        assign_perm('work_on_project', group_executors, cls.project)
+
+        cls.task_type = TaskType.objects.create(name='Bug')
+        cls.task_priority = TaskPriority.objects.create(name='High')
+
+    def setUp(self):
+        # the cached rows would outlive the rolled back test transaction
+        cache.clear()
+
+    @classmethod
+    def create_task(cls, **kwargs):
+        fields = {
+            'topic': 'Task',
+            'description': 'Description',
+            'start_date': datetime.date(2021, 6, 1),
+            'finish_date': datetime.date(2021, 6, 30),
+            'type': cls.task_type,
+            'priority': cls.task_priority,
+            'estimated_time': 8,
+            'executor': cls.worker,
+            'author': cls.admin,
+            'project': cls.project,
+        }
+        fields.update(kwargs)
+        return Task.objects.create(**fields)
+
+
+class CursorPaginatorTests(TrackerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tasks = [cls.create_task(topic=f'Task {number}') for number in range(5)]
+
+    def test_walks_forward_and_back(self):
+        paginator = CursorPaginator(Task.objects.all(), per_page=2)
+
+        first = paginator.get_page()
+        self.assertEqual(first.object_list, self.tasks[:2])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(second.object_list, self.tasks[2:4])
+        self.assertTrue(second.has_previous())
+
+        last = paginator.get_page(second.next_cursor)
+        self.assertEqual(last.object_list, self.tasks[4:])
+        self.assertFalse(last.has_next())
+
+        back = paginator.get_page(last.previous_cursor)
+        self.assertEqual(back.object_list, self.tasks[2:4])
+        self.assertTrue(back.has_next())
+
+        self.assertEqual(paginator.get_page(back.previous_cursor).object_list, self.tasks[:2])
+        self.assertFalse(paginator.get_page(back.previous_cursor).has_previous())
+
+    def test_invalid_cursor_gives_first_page(self):
+        paginator = CursorPaginator(Task.objects.all(), per_page=2)
+
+        for cursor in ('garbage', 'WyJ4IiwgW119', '!!'):
+            self.assertEqual(paginator.get_page(cursor).object_list, self.tasks[:2])
+
+    def test_seeks_on_composite_key(self):
+        task = self.tasks[0]
+        created = timezone.now()
+        comments = [
+            Comment.objects.create(author=self.worker, comment=str(number), task=task, created=created)
+            for number in range(3)
+        ]
+        paginator = CursorPaginator(task.comments.all(), ordering=('created', 'id'), per_page=2)
+
+        first = paginator.get_page()
+        self.assertEqual(first.object_list, comments[:2])
+        self.assertEqual(paginator.get_page(first.next_cursor).object_list, comments[2:])
+
+    @override_settings(PAGINATE_BY=2)
+    def test_project_page_renders_cursor_links(self):
+        self.client.force_login(self.worker)
+
+        response = self.client.get(reverse('main:project', kwargs={'project_name': 'tracker'}))
+        self.assertEqual(list(response.context['page_obj']), self.tasks[:2])
+        self.assertContains(response, f'cursor={response.context["page_obj"].next_cursor}')
+
+        response = self.client.get(
+            reverse('main:project', kwargs={'project_name': 'tracker'}),
+            {'cursor': response.context['page_obj'].next_cursor},
+        )
+        self.assertEqual(list(response.context['page_obj']), self.tasks[2:4])
+
+
+class TaskListQueryTests(TrackerTestCase):
+    def count_project_page_queries(self):
+        self.client.force_login(self.worker)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('main:project', kwargs={'project_name': 'tracker'}))
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    # rendered every time, so every request runs the list query
+    @override_settings(PAGINATE_BY=50, FRAGMENT_CACHE_TIMEOUT=0)
+    def test_query_count_does_not_depend_on_page_size(self):
+        self.create_task()
+        # warm the permission cache
+        self.count_project_page_queries()
+        single = self.count_project_page_queries()
+
+        for number in range(49):
+            executor = User.objects.create_user(f'executor{number}')
+            self.create_task(
+                executor=executor,
+                type=TaskType.objects.create(name=f'Type {number}'),
+                priority=TaskPriority.objects.create(name=f'Priority {number}'),
+            )
+
+        self.assertEqual(self.count_project_page_queries(), single)
+
+
+class TaskTimeRollupTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task()
+
+    def assertRollup(self, time_spent, log_count):
+        rollup = TaskTimeRollup.objects.get(task=self.task)
+        self.assertEqual((rollup.time_spent, rollup.log_count), (time_spent, log_count))
+
+    def test_follows_log_writes(self):
+        self.client.force_login(self.admin)
+        kwargs = {'project_name': 'tracker', 'task_id': self.task.id}
+
+        self.client.post(reverse('main:time_loging', kwargs=kwargs), {'comment': 'Work', 'time_spent': 3, 'date': '2021-06-01'})
+        self.client.post(reverse('main:time_loging', kwargs=kwargs), {'comment': 'Work', 'time_spent': 2, 'date': '2021-06-02'})
+        self.assertRollup(5, 2)
+
+        log = TimeLoging.objects.first()
+        self.client.post(
+            reverse('main:log_edit', kwargs={**kwargs, 'log_id': log.id}), {'comment': 'Work', 'time_spent': 7, 'date': '2021-06-01'}
+        )
+        self.assertRollup(9, 2)
+
+        log.delete()
+        self.assertRollup(2, 1)
+
+        response = self.client.get(reverse('main:task', kwargs=kwargs))
+        self.assertEqual(response.context['spend_time'], 2)
+
+        self.task.delete()
+        self.assertFalse(TaskTimeRollup.objects.exists())
+
+    def test_command_verifies_and_rebuilds(self):
+        TimeLoging.objects.create(author=self.worker, time_spent=4, comment='Work', task=self.task)
+        TaskTimeRollup.objects.filter(task=self.task).update(time_spent=0)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_time_rollups', verify=True, stdout=StringIO())
+
+        call_command('rebuild_time_rollups', stdout=StringIO())
+        self.assertRollup(4, 1)
+        call_command('rebuild_time_rollups', verify=True, stdout=StringIO())
+
+
+class TimeLogImportTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task()
+        other_group = Group.objects.create(name='other')
+        self.other_task = self.create_task(project=Project.objects.create(
+            title='Other', description='Other', unique_name='other', group_executors=other_group,
+        ))
+
+    def test_upload_skips_invalid_rows(self):
+        self.client.force_login(self.worker)
+        content = (
+            'task,time_spent,comment,author\n'
+            f'{self.task.id},3,Work,\n'
+            f'{self.task.id},many,Work,\n'
+            f'{self.other_task.id},1,Not my project,\n'
+            f'{self.task.id},1,Not my log,admin\n'
+            '999999,1,Missing task,\n'
+            f'{self.task.id},2,More work,worker\n'
+        )
+
+        response = self.client.post(reverse('main:import_time_logs'), {
+            'file': SimpleUploadedFile('logs.csv', content.encode()),
+            'format': 'csv',
+        })
+
+        self.assertEqual([line for line, _ in response.context['errors']], [3, 4, 5, 6])
+        self.assertEqual(
+            list(TimeLoging.objects.values_list('time_spent', 'author')),
+            [(3, self.worker.id), (2, self.worker.id)],
+        )
+        self.assertEqual(TaskTimeRollup.objects.get(task=self.task).time_spent, 5)
+
+    def test_upload_encoding(self):
+        self.client.force_login(self.worker)
+        url = reverse('main:import_time_logs')
+        content = f'task,time_spent,comment\n{self.task.id},3,Café\n'
+
+        response = self.client.post(url, {
+            'file': SimpleUploadedFile('logs.csv', content.encode('latin-1')), 'format': 'csv',
+        })
+        self.assertFormError(response, 'form', 'file', 'The file has to be UTF-8 encoded.')
+        self.assertFalse(TimeLoging.objects.exists())
+
+        # as Excel saves it
+        self.client.post(url, {'file': SimpleUploadedFile('logs.csv', content.encode('utf-8-sig')), 'format': 'csv'})
+        self.assertEqual(list(TimeLoging.objects.values_list('time_spent', 'comment')), [(3, 'Café')])
+
+    def test_command_imports_in_batches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'logs.jsonl')
+            with open(path, 'w') as stream:
+                for number in range(25):
+                    stream.write(f'{{"task": {self.task.id}, "time_spent": 1, "comment": "Log {number}"}}\n')
+                stream.write('not json\n')
+
+            stderr = StringIO()
+            call_command('import_time_logs', path, author='worker', batch_size=10, stdout=StringIO(), stderr=stderr)
+
+        self.assertEqual(TimeLoging.objects.count(), 25)
+        self.assertIn('Line 26', stderr.getvalue())
+        rollup = TaskTimeRollup.objects.get(task=self.task)
+        self.assertEqual((rollup.time_spent, rollup.log_count), (25, 25))
+
+
+class ChoicesTests(TrackerTestCase):
+    def test_form_modules_do_not_query_at_import(self):
+        names = ['main.forms', 'accounts.forms']
+        modules = {name: sys.modules.pop(name) for name in names}
+        try:
+            with self.assertNumQueries(0):
+                for name in names:
+                    importlib.import_module(name)
+        finally:
+            sys.modules.update(modules)
+            for name, module in modules.items():
+                package, _, attribute = name.rpartition('.')
+                setattr(sys.modules[package], attribute, module)
+
+    def test_choices_are_cached_until_rows_change(self):
+        self.assertEqual(task_type_choices(), [(self.task_type.id, 'Bug')])
+        with self.assertNumQueries(0):
+            self.assertEqual(task_type_choices(), [(self.task_type.id, 'Bug')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            feature = TaskType.objects.create(name='Feature')
+        self.assertEqual(task_type_choices(), [(self.task_type.id, 'Bug'), (feature.id, 'Feature')])
+
+        self.assertEqual(worker_choices(), [(self.worker.id, 'worker')])
+        self.client.force_login(self.worker)
+        with self.assertNumQueries(0):
+            worker_choices()
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer = User.objects.create_user('newcomer')
+            # rebuilt by a concurrent request, which can not see the new user yet
+            cache.set(WORKER_CHOICES_KEY, [(self.worker.id, 'worker')], None)
+        self.assertEqual(worker_choices(), [(self.worker.id, 'worker'), (newcomer.id, 'newcomer')])
+
+
+class ReferenceCacheTests(TrackerTestCase):
+    def test_lookups_do_not_query_until_a_write(self):
+        self.assertEqual(task_types.get(self.task_type.id), self.task_type)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(task_types.get(str(self.task_type.id)).name, 'Bug')
+            with self.assertRaises(TaskType.DoesNotExist):
+                task_types.get(0)
+
+        TaskType.objects.filter(pk=self.task_type.id).update(name='Defect')
+        # another worker saving a row only replaces the version in the shared cache
+        with self.captureOnCommitCallbacks(execute=True):
+            task_types.invalidate()
+        self.assertEqual(task_types.get(self.task_type.id).name, 'Defect')
+
+    def test_version_is_replaced_after_the_commit(self):
+        version = task_types.current_version()
+        task_types.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            feature = TaskType.objects.create(name='Feature')
+            # other workers would still read the committed rows, they keep their copies
+            self.assertEqual(task_types.current_version(), version)
+            self.assertEqual(task_types.all(), [self.task_type])
+
+        self.assertNotEqual(task_types.current_version(), version)
+        self.assertEqual(task_types.get(feature.id).name, 'Feature')
+
+    def test_edit_task_resolves_type_and_priority_from_cache(self):
+        task = self.create_task()
+        feature = TaskType.objects.create(name='Feature')
+        task_types.all()
+        self.client.force_login(self.admin)
+
+        self.client.post(reverse('main:edit_task', kwargs={'project_name': 'tracker', 'task_id': task.id}), {
+            'topic': task.topic,
+            'description': task.description,
+            'start_date': task.start_date,
+            'finish_date': task.finish_date,
+            'type': feature.id,
+            'priority': self.task_priority.id,
+            'estimated_time': task.estimated_time,
+            'executor': self.worker.id,
+            'version': task.version,
+        })
+
+        task.refresh_from_db()
+        self.assertEqual(task.type, feature)
+
+
+class ProjectMembershipTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        position = Position.objects.create(name='Developer', administrator_rights=False)
+        self.users = [self.worker] + [User.objects.create_user(f'user{number}') for number in range(20)]
+        for user in self.users:
+            Employee.objects.create(user=user, birthday=datetime.date(1990, 1, 1), position=position)
+        Employee.objects.filter(user=self.worker).update(project=self.project)
+        self.client.force_login(self.admin)
+
+    def edit_project(self, workers):
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('main:edit_project', kwargs={'project_name': 'tracker'}), {
+                'title': 'Tracker',
+                'description': 'Time tracker',
+                'workers': [user.id for user in workers],
+            })
+        return len(context)
+
+    def test_applies_only_the_difference(self):
+        queries = self.edit_project([self.users[1], self.users[2]])
+        self.assertEqual(set(self.project.group_executors.user_set.all()), {self.users[1], self.users[2]})
+        self.assertEqual(
+            set(Employee.objects.filter(project=self.project).values_list('user', flat=True)),
+            {self.users[1].id, self.users[2].id},
+        )
+        self.assertIsNone(Employee.objects.get(user=self.worker).project)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(100):
+                User.objects.create_user(f'newcomer{number}')
+
+        # the same shape of change costs the same, however many users there are
+        self.assertEqual(self.edit_project([self.users[2], self.users[3], self.users[4]]), queries)
+        self.assertEqual(
+            set(self.project.group_executors.user_set.all()), {self.users[2], self.users[3], self.users[4]}
+        )
+
+    def test_new_project_members(self):
+        self.client.post(reverse('main:projects'), {
+            'title': 'New',
+            'description': 'New project',
+            'unique_name': 'new',
+            'workers': [self.users[3].id, self.users[4].id],
+        })
+
+        project = Project.objects.get(unique_name='new')
+        self.assertEqual(set(project.group_executors.user_set.all()), {self.users[3], self.users[4]})
+        self.assertEqual(Employee.objects.filter(project=project).count(), 2)
+        self.assertTrue(self.users[3].has_perm('main.work_on_project', project))
+
+
+class ProjectPermissionTests(TrackerTestCase):
+    def get_project_page(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('main:project', kwargs={'project_name': 'tracker'}))
+        permission_queries = [query for query in context if 'guardian_' in query['sql']]
+        return response.status_code, len(permission_queries)
+
+    def test_grants_are_cached_across_requests(self):
+        self.client.force_login(self.worker)
+
+        status_code, permission_queries = self.get_project_page()
+        self.assertEqual(status_code, 200)
+        self.assertGreater(permission_queries, 0)
+
+        self.assertEqual(self.get_project_page(), (200, 0))
+
+    def test_membership_change_revokes_access(self):
+        self.client.force_login(self.worker)
+        self.assertEqual(self.get_project_page()[0], 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.group_executors.user_set.remove(self.worker)
+            # still the old grants until the commit
+            self.assertEqual(self.get_project_page()[0], 200)
+        self.assertEqual(self.get_project_page()[0], 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.group_executors.user_set.add(self.worker)
+        self.assertEqual(self.get_project_page()[0], 200)
+
+    def test_unknown_project(self):
+        self.client.force_login(self.worker)
+        self.assertEqual(self.client.get(reverse('main:project', kwargs={'project_name': 'missing'})).status_code, 404)
+
+    def test_anonymous_users_can_not_tell_which_projects_exist(self):
+        for name in ('main:project', 'main:tasks_export', 'main:edit_project'):
+            existing, missing = [
+                self.client.get(reverse(name, kwargs={'project_name': project_name}))
+                for project_name in ('tracker', 'missing')
+            ]
+            self.assertEqual(existing.status_code, 302)
+            self.assertEqual(missing.status_code, 302)
+            self.assertEqual(existing['Location'].split('?')[0], missing['Location'].split('?')[0])
+
+
+class ProjectResolverTests(TrackerTestCase):
+    def project_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # the permission check has its own cache
+        return [
+            query for query in context
+            if 'FROM "main_project"' in query['sql'] and 'guardian_' not in query['sql']
+        ]
+
+    def test_project_is_resolved_once_and_then_cached(self):
+        task = self.create_task()
+        self.client.force_login(self.worker)
+        url = reverse('main:edit_task', kwargs={'project_name': 'tracker', 'task_id': task.id})
+
+        self.assertEqual(len(self.project_queries(url)), 1)
+        self.assertEqual(self.project_queries(url), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.filter(pk=self.project.pk).update(title='Renamed')
+            self.project.save()
+        self.assertEqual(len(self.project_queries(url)), 1)
+
+    def test_task_of_another_project_is_not_found(self):
+        other_project = Project.objects.create(
+            title='Other', description='', unique_name='other', group_executors=Group.objects.create(name='other'),
+        )
+        task = self.create_task(project=other_project)
+        self.client.force_login(self.worker)
+
+        response = self.client.get(reverse('main:task', kwargs={'project_name': 'tracker', 'task_id': task.id}))
+        self.assertEqual(response.status_code, 404)
+
+
+class TimeReportTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task()
+
+    def log(self, author, time_spent, date):
+        return TimeLoging.objects.create(
+            author=author, time_spent=time_spent, comment='Work', task=self.task, date=date
+        )
+
+    def daily_rollups(self):
+        return set(DailyTimeRollup.objects.filter(log_count__gt=0).values_list(
+            'author__username', 'day', 'time_spent', 'log_count'
+        ))
+
+    def test_daily_rollup_follows_log_writes(self):
+        first = self.log(self.worker, 3, datetime.date(2021, 6, 1))
+        self.log(self.worker, 2, datetime.date(2021, 6, 1))
+        self.log(self.admin, 4, datetime.date(2021, 6, 2))
+        self.assertEqual(self.daily_rollups(), {
+            ('worker', datetime.date(2021, 6, 1), 5, 2),
+            ('admin', datetime.date(2021, 6, 2), 4, 1),
+        })
+
+        first.date = datetime.date(2021, 6, 2)
+        first.save()
+        self.assertEqual(self.daily_rollups(), {
+            ('worker', datetime.date(2021, 6, 1), 2, 1),
+            ('worker', datetime.date(2021, 6, 2), 3, 1),
+            ('admin', datetime.date(2021, 6, 2), 4, 1),
+        })
+
+        first.delete()
+        rollups = self.daily_rollups()
+        DailyTimeRollup.objects.all().delete()
+        call_command('rebuild_time_rollups', daily=True, stdout=StringIO())
+        self.assertEqual(self.daily_rollups(), rollups)
+
+    def test_report_reads_the_rollup(self):
+        self.log(self.worker, 3, datetime.date(2021, 6, 1))
+        self.log(self.worker, 2, datetime.date(2021, 6, 3))
+        self.log(self.admin, 4, datetime.date(2021, 7, 1))
+        self.client.force_login(self.admin)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('main:time_report'), {
+                'date_from': '2021-06-01', 'date_to': '2021-06-30', 'group_by': 'author_project',
+            })
+
+        self.assertEqual(list(response.context['rows']), [('worker', 'Tracker', 5, 2)])
+        self.assertFalse([query for query in context if 'main_timeloging' in query['sql']])
+
+    def test_projects_with_the_same_title_are_reported_apart(self):
+        namesake = Project.objects.create(
+            title='Tracker', description='', unique_name='tracker-2', group_executors=Group.objects.create(name='two'),
+        )
+        self.log(self.worker, 3, datetime.date(2021, 6, 1))
+        TimeLoging.objects.create(
+            author=self.worker, time_spent=2, comment='Work', task=self.create_task(project=namesake),
+            date=datetime.date(2021, 6, 2),
+        )
+        self.client.force_login(self.admin)
+
+        response = self.client.get(reverse('main:time_report'), {
+            'date_from': '2021-06-01', 'date_to': '2021-06-30', 'group_by': 'project',
+        })
+        self.assertEqual(list(response.context['rows']), [('Tracker', 3, 1), ('Tracker', 2, 1)])
+
+
+class ExportTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task(topic='Export')
+        self.other_task = self.create_task(topic='Other')
+        TimeLoging.objects.create(
+            author=self.worker, time_spent=3, comment='Work', task=self.task, date=datetime.date(2021, 6, 1)
+        )
+        TimeLoging.objects.create(
+            author=self.admin, time_spent=2, comment='Review', task=self.task, date=datetime.date(2021, 6, 5)
+        )
+        TimeLoging.objects.create(
+            author=self.worker, time_spent=1, comment='Other', task=self.other_task, date=datetime.date(2021, 6, 9)
+        )
+        self.client.force_login(self.worker)
+
+    def get_csv(self, name, **params):
+        response = self.client.get(reverse(name, kwargs={'project_name': 'tracker'}), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def test_time_logs_are_filtered(self):
+        rows = self.get_csv('main:time_logs_export', task=self.task.id, date_to='2021-06-04')
+        self.assertEqual(rows[0][:6], ['id', 'date', 'task', 'task_topic', 'author', 'time_spent'])
+        self.assertEqual(
+            [row[1:7] for row in rows[1:]], [['2021-06-01', str(self.task.id), 'Export', 'worker', '3', 'Work']]
+        )
+
+        rows = self.get_csv('main:time_logs_export', author='worker')
+        self.assertEqual([row[6] for row in rows[1:]], ['Work', 'Other'])
+
+    def test_tasks_export_joins_related_names(self):
+        with CaptureQueriesContext(connection) as context:
+            rows = self.get_csv('main:tasks_export')
+        self.assertEqual(len([query for query in context if 'main_task' in query['sql']]), 1)
+
+        self.assertEqual([row[1] for row in rows[1:]], ['Export', 'Other'])
+        self.assertEqual(rows[1][5:11], ['Bug', 'High', '8', '5', 'admin', 'worker'])
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('export_csv', 'time_logs', 'tracker', '--from', '2021-06-05', stdout=stdout)
+        rows = list(csv.reader(stdout.getvalue().splitlines()))
+        self.assertEqual([row[6] for row in rows[1:]], ['Review', 'Other'])
+
+
+@override_settings(PAGINATE_BY=2)
+class IndexUsageTests(TrackerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tasks = [cls.create_task(topic=f'Task {number}') for number in range(3)]
+        task = cls.tasks[0]
+        for number in range(3):
+            Comment.objects.create(author=cls.worker, comment=f'Comment {number}', task=task)
+            TimeLoging.objects.create(author=cls.worker, time_spent=1, comment=f'Log {number}', task=task)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.worker)
+
+    def explain(self, sql, params=()):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # the test tables are tiny, a sequential scan would always win
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}', params)
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return '\n'.join(str(row) for row in cursor.fetchall())
+
+    def page_query(self, url, table):
+        # the second page, so the plan covers the keyset seek as well
+        cursor = self.client.get(url).context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, {'cursor': cursor})
+        queries = [query['sql'] for query in context if f'FROM "{table}"' in query['sql']]
+        self.assertEqual(len(queries), 1)
+        return queries[0]
+
+    def test_project_tasks_page(self):
+        sql = self.page_query(reverse('main:project', kwargs={'project_name': 'tracker'}), 'main_task')
+        self.assertIn('task_project_id_idx', self.explain(sql))
+
+    def test_task_comments_page(self):
+        url = reverse('main:task', kwargs={'project_name': 'tracker', 'task_id': self.tasks[0].id})
+        sql = self.page_query(url, 'main_comment')
+        self.assertIn('comment_task_created_idx', self.explain(sql))
+
+    def test_time_logs_page(self):
+        url = reverse('main:time_loging', kwargs={'project_name': 'tracker', 'task_id': self.tasks[0].id})
+        sql = self.page_query(url, 'main_timeloging')
+        self.assertIn('timelog_task_id_idx', self.explain(sql))
+
+    def test_executor_deadlines(self):
+        tasks = Task.objects.filter(executor=self.worker, finish_date__lte=datetime.date(2021, 7, 1))
+        sql, params = tasks.order_by('finish_date').query.sql_with_params()
+        self.assertIn('task_executor_finish_idx', self.explain(sql, params))
+
+    def test_expired_activations(self):
+        from accounts.models import Activation
+
+        activations = Activation.objects.filter(created_at__lt=timezone.now())
+        sql, params = activations.query.sql_with_params()
+        self.assertIn('activation_created_at_idx', self.explain(sql, params))
+
+
+class SearchTests(TrackerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.in_topic = cls.create_task(topic='Deploy pipeline', description='Ship the <b>release</b>')
+        cls.in_description = cls.create_task(topic='Fix login', description='Broken pipeline step')
+        cls.in_comment = cls.create_task(topic='Update docs', description='Install guide')
+        Comment.objects.create(author=cls.worker, comment='The pipeline is flaky', task=cls.in_comment)
+
+        other_project = Project.objects.create(
+            title='Other', description='', unique_name='other', group_executors=Group.objects.create(name='other'),
+        )
+        cls.other = cls.create_task(topic='Other pipeline', project=other_project)
+
+    def search(self, text, **params):
+        response = self.client.get(reverse('main:search'), {'q': text, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_results_are_ranked_and_scoped(self):
+        self.client.force_login(self.worker)
+        self.assertEqual(list(self.search('pipeline')), [self.in_topic, self.in_description, self.in_comment])
+        self.assertEqual(list(self.search('release')), [self.in_topic])
+        self.assertEqual(list(self.search('pipeline"*')), [self.in_topic, self.in_description, self.in_comment])
+
+        self.client.force_login(self.admin)
+        self.assertIn(self.other, self.search('pipeline'))
+
+        response = self.client.get(reverse('main:project', kwargs={'project_name': 'tracker'}), {'q': 'flaky'})
+        self.assertEqual(list(response.context['page_obj']), [self.in_comment])
+
+    def test_index_follows_writes(self):
+        self.client.force_login(self.worker)
+        self.in_topic.topic = 'Deploy builds'
+        self.in_topic.save()
+        Comment.objects.filter(task=self.in_comment).delete()
+        self.in_description.delete()
+
+        self.assertEqual(list(self.search('pipeline')), [])
+        self.assertEqual(list(self.search('builds')), [self.in_topic])
+
+    @override_settings(PAGINATE_BY=2)
+    def test_pages(self):
+        self.client.force_login(self.worker)
+
+        first = self.search('pipeline')
+        self.assertEqual(list(first), [self.in_topic, self.in_description])
+        self.assertFalse(first.has_previous())
+
+        second = self.search('pipeline', cursor=first.next_cursor)
+        self.assertEqual(list(second), [self.in_comment])
+        self.assertFalse(second.has_next())
+
+        self.assertEqual(list(self.search('pipeline', cursor=second.previous_cursor)), list(first))
+
+
+class TaskHistoryTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task()
+        self.url = reverse('main:edit_task', kwargs={'project_name': 'tracker', 'task_id': self.task.id})
+        self.client.force_login(self.admin)
+
+    def edit(self, **fields):
+        data = {
+            'topic': self.task.topic,
+            'description': self.task.description,
+            'start_date': self.task.start_date,
+            'finish_date': self.task.finish_date,
+            'type': self.task_type.id,
+            'priority': self.task_priority.id,
+            'estimated_time': self.task.estimated_time,
+            'executor': self.worker.id,
+            'version': 1,
+        }
+        data.update(fields)
+        return self.client.post(self.url, data)
+
+    def test_edit_records_changes_and_updates_only_changed_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            self.edit(topic='Renamed', estimated_time=5)
+
+        updates = [query['sql'] for query in context if query['sql'].startswith('UPDATE "main_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"topic"', updates[0])
+        self.assertNotIn('"description"', updates[0])
+
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.topic, self.task.estimated_time, self.task.version), ('Renamed', 5, 2))
+        self.assertEqual(
+            list(TaskChange.objects.filter(task=self.task).values_list('field', 'old_value', 'new_value', 'version')),
+            [('topic', 'Task', 'Renamed', 2), ('estimated_time', 8, 5, 2)],
+        )
+        self.assertContains(self.client.get(self.url), 'Renamed')
+
+    def test_stale_edit_is_rejected(self):
+        self.edit(topic='First')
+        response = self.edit(topic='Second')
+
+        self.assertRedirects(response, self.url)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.topic, 'First')
+        self.assertEqual(TaskChange.objects.filter(task=self.task).count(), 1)
+
+    def test_admin_edit_during_a_page_edit(self):
+        # the edit page was opened at version 1, then the task is changed in the admin
+        response = self.client.post(reverse('admin:main_task_change', args=[self.task.id]), {
+            'topic': 'Admin topic',
+            'description': self.task.description,
+            'start_date': self.task.start_date,
+            'finish_date': self.task.finish_date,
+            'type': self.task_type.id,
+            'priority': self.task_priority.id,
+            'estimated_time': self.task.estimated_time,
+            'executor': self.worker.id,
+            'project': self.project.id,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(TaskChange.objects.values_list('field', 'old_value', 'new_value', 'version', 'editor')),
+            [('topic', 'Task', 'Admin topic', 2, self.admin.id)],
+        )
+
+        self.assertRedirects(self.edit(topic='Page topic'), self.url)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.topic, self.task.version), ('Admin topic', 2))
+
+        # and a save with update_fields too
+        self.task.estimated_time = 3
+        self.task.save(update_fields=['estimated_time'])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 3)
+        self.assertEqual(TaskChange.objects.last().field, 'estimated_time')
+
+    def test_history_of_a_deleted_type(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            old_type = TaskType.objects.create(name='Old type')
+        self.edit(type=old_type.id)
+        self.edit(type=self.task_type.id, version=2)
+        # no task uses it any more
+        old_type_id = old_type.id
+        with self.captureOnCommitCallbacks(execute=True):
+            old_type.delete()
+
+        self.assertContains(self.client.get(self.url), f'#{old_type_id}')
+        self.assertIn(f'Old value: #{old_type_id}', change_notification_text(self.admin, TaskChange.objects.all()))
+
+
+class ApiTests(TrackerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.tasks = [cls.create_task(topic=f'Task {number}') for number in range(3)]
+        Comment.objects.create(author=cls.worker, comment='Looks good', task=cls.tasks[0])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.worker)
+
+    def get(self, name, status=200, **params):
+        kwargs = {'project_name': 'tracker'} if name != 'projects' else {}
+        if name in ('comments', 'time_logs'):
+            kwargs['task_id'] = params.pop('task_id')
+        response = self.client.get(reverse(f'api:{name}', kwargs=kwargs), params)
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+    def task_queries(self, **params):
+        self.get('tasks', **params)
+        with CaptureQueriesContext(connection) as context:
+            data = self.get('tasks', **params)
+        return data, [query['sql'] for query in context if 'FROM "main_task"' in query['sql']]
+
+    def test_only_selected_fields_are_queried(self):
+        data, queries = self.task_queries(fields='id,topic')
+        self.assertEqual(data['results'][0], {'id': self.tasks[0].id, 'topic': 'Task 0'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0])
+        self.assertNotIn('"description"', queries[0])
+
+        data, queries = self.task_queries(fields='executor,time_spent')
+        self.assertEqual(data['results'][0], {'executor': 'worker', 'time_spent': 0})
+        self.assertIn('"auth_user"', queries[0])
+        self.assertNotIn('"main_tasktype"', queries[0])
+
+        self.assertIn('error', self.get('tasks', status=400, fields='topic,password'))
+
+    def test_cursor_pages_and_batches(self):
+        first = self.get('tasks', fields='id', limit=2)
+        self.assertEqual([row['id'] for row in first['results']], [task.id for task in self.tasks[:2]])
+        second = self.get('tasks', fields='id', limit=2, cursor=first['next'])
+        self.assertEqual([row['id'] for row in second['results']], [self.tasks[2].id])
+        self.assertIsNone(second['next'])
+
+        batch = self.get('tasks', fields='id,topic', ids=f'{self.tasks[2].id},{self.tasks[0].id},0')
+        self.assertEqual([row['topic'] for row in batch['results']], ['Task 0', 'Task 2'])
+        self.get('tasks', status=400, ids='1,x')
+
+        comments = self.get('comments', task_id=self.tasks[0].id, fields='author,comment')
+        self.assertEqual(comments['results'], [{'author': 'worker', 'comment': 'Looks good'}])
+
+    def test_access(self):
+        self.assertEqual([row['unique_name'] for row in self.get('projects')['results']], ['tracker'])
+
+        other_project = Project.objects.create(
+            title='Other', description='', unique_name='other', group_executors=Group.objects.create(name='other'),
+        )
+        other_task = self.create_task(project=other_project)
+        response = self.client.get(reverse('api:tasks', kwargs={'project_name': 'other'}))
+        self.assertEqual(response.status_code, 403)
+        self.get('time_logs', status=404, task_id=other_task.id)
+
+        self.client.logout()
+        self.get('projects', status=401)
+
+
+class FragmentCacheTests(TrackerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.task = cls.create_task(topic='Cached task')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.worker)
+
+    def get(self, name, table, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(f'main:{name}', kwargs={'project_name': 'tracker', **kwargs}))
+        self.assertEqual(response.status_code, 200)
+        return response, [query for query in context if f'FROM "{table}"' in query['sql']]
+
+    def test_project_tasks_are_served_from_cache_until_a_write(self):
+        first, queries = self.get('project', 'main_task')
+        self.assertEqual(len(queries), 1)
+
+        second, queries = self.get('project', 'main_task')
+        self.assertEqual(queries, [])
+        self.assertContains(second, 'Cached task')
+        self.assertEqual(fragment_stats()['project_tasks'], (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_task(topic='New task')
+        self.assertContains(self.get('project', 'main_task')[0], 'New task')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TimeLoging.objects.create(author=self.worker, time_spent=7, comment='Log', task=self.task)
+        self.assertContains(self.get('project', 'main_task')[0], 'Spent time: 7')
+
+    def test_project_tasks_follow_project_and_comment_writes(self):
+        self.get('project', 'main_task')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.title = 'Renamed'
+            self.project.save()
+        self.assertContains(self.get('project', 'main_task')[0], 'Project: Renamed')
+
+        url = reverse('main:project', args=['tracker']) + '?q=zebra'
+        self.assertNotContains(self.client.get(url), 'Cached task')
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(author=self.admin, comment='A zebra', task=self.task)
+        self.assertContains(self.client.get(url), 'Cached task')
+
+    def test_task_comments_follow_comment_writes(self):
+        self.get('task', 'main_comment', task_id=self.task.id)
+        self.assertEqual(self.get('task', 'main_comment', task_id=self.task.id)[1], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(author=self.admin, comment='Fresh comment', task=self.task)
+        response, queries = self.get('task', 'main_comment', task_id=self.task.id)
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, 'Fresh comment')
+        self.assertEqual(fragment_stats()['task_comments'], (1, 2))
+
+    def test_comments_show_their_authors_avatars(self):
+        position = Position.objects.create(name='Developer', administrator_rights=False)
+        authors = [User.objects.create_user(f'author{number}') for number in range(4)]
+        for number, author in enumerate(authors):
+            Employee.objects.create(user=author, birthday=datetime.date(1990, 1, 1), position=position)
+            # as process_avatars leaves it
+            Employee.objects.filter(user=author).update(avatar=f'avatars/{number}.jpg', avatar_hash=f'{number:016x}')
+
+        url = reverse('main:task', args=['tracker', self.task.id])
+
+        def comment_page():
+            # every query of a cold page
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            return response, len(context)
+
+        Comment.objects.create(author=authors[0], comment='First', task=self.task)
+        one_author = comment_page()[1]
+
+        for author in authors * 3:
+            Comment.objects.create(author=author, comment='More', task=self.task)
+        response, queries = comment_page()
+        self.assertEqual(queries, one_author)
+        for number in range(4):
+            self.assertContains(response, f'avatars/thumbnails/{number:016x}-60.webp')
+
+        # the same list for every viewer, until an author changes the avatar
+        self.client.force_login(self.admin)
+        self.assertEqual(self.get('task', 'main_comment', task_id=self.task.id)[1], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            employee = Employee.objects.get(user=authors[0])
+            employee.avatar = 'avatars/new.jpg'
+            employee.save()
+        response, queries = self.get('task', 'main_comment', task_id=self.task.id)
+        self.assertContains(response, 'avatars/new.jpg')
+
+
+class MetricsTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        overrides = override_settings(METRICS_DIR=self.directory)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        registry.reset()
+
+    def get_metrics(self, **extra):
+        response = self.client.get(reverse('metrics'), **extra)
+        return response, response.content.decode()
+
+    def sample(self, text, name):
+        for line in text.splitlines():
+            if line.startswith(name + ' '):
+                return float(line.split()[-1])
+
+    def test_requests_are_added_up_across_processes(self):
+        self.create_task()
+        self.client.force_login(self.worker)
+        for _ in range(2):
+            self.assertEqual(self.client.get(reverse('main:project', args=['tracker'])).status_code, 200)
+
+        # the file of another worker process
+        other = empty_view()
+        other['requests']['200'] = 3
+        other['buckets'][0] = 3
+        other['queries'] = 30
+        with open(os.path.join(self.directory, '1-other.json'), 'w') as file:
+            json.dump({'main:project': other}, file)
+
+        response, text = self.get_metrics()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.sample(text, 'tracker_requests_total{view="main:project",status="200"}'), 5)
+        self.assertEqual(self.sample(text, 'tracker_request_duration_seconds_count{view="main:project"}'), 5)
+        self.assertEqual(
+            self.sample(text, 'tracker_request_duration_seconds_bucket{view="main:project",le="+Inf"}'), 5
+        )
+        self.assertGreater(self.sample(text, 'tracker_db_queries_total{view="main:project"}'), 30)
+        self.assertGreater(self.sample(text, 'tracker_template_render_seconds_total{view="main:project"}'), 0)
+        self.assertGreater(self.sample(text, 'tracker_response_bytes_total{view="main:project"}'), 0)
+        self.assertIn('tracker_fragment_cache_misses_total{fragment="project_tasks"} 1', text)
+
+    def test_only_local_scrapes_are_allowed(self):
+        self.assertEqual(self.get_metrics(REMOTE_ADDR='10.0.0.1')[0].status_code, 403)
+        self.assertEqual(self.get_metrics(HTTP_X_FORWARDED_FOR='10.0.0.1')[0].status_code, 403)
+
+
+class ProfilerTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(PROFILE_DIR=directory.name, PROFILE_KEEP=2)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.url = reverse('main:project', args=['tracker'])
+
+    def test_superusers_profile_requests(self):
+        self.create_task()
+        self.client.force_login(self.admin)
+        self.client.get(self.url, {'profile': '1'})
+
+        profile, = list_profiles()
+        self.assertEqual((profile['view'], profile['status'], profile['user']), ('main:project', 200, 'admin'))
+        self.assertTrue(any('main_task' in query['sql'] for query in profile['queries']))
+        self.assertTrue(any('main/views.py' in frame['function'] for frame in profile['top_cumulative']))
+        self.assertTrue(os.path.exists(os.path.join(settings.PROFILE_DIR, profile['name'] + '.prof')))
+
+        # only the newest PROFILE_KEEP are kept
+        self.client.get(self.url, HTTP_X_PROFILE='1')
+        self.client.get(self.url, HTTP_X_PROFILE='1')
+        self.assertEqual(len(list_profiles()), 2)
+        self.assertEqual(len(os.listdir(settings.PROFILE_DIR)), 4)
+
+        response = self.client.get(reverse('main:profiles'))
+        self.assertContains(response, self.url, count=2)
+
+    def test_other_users_can_not_profile(self):
+        self.client.force_login(self.worker)
+        self.client.get(self.url, {'profile': '1'}, HTTP_X_PROFILE='1')
+
+        self.assertEqual(list_profiles(), [])
+        self.assertRedirects(
+            self.client.get(reverse('main:profiles')), reverse('main:index'), fetch_redirect_response=False,
+        )
+
+
+class AsyncViewTests(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(PROFILE_DIR=directory.name, METRICS_DIR=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def get(self, url):
+        # through the async handler and middleware, as under ASGI
+        async def request():
+            return await self.async_client.get(url)
+
+        return async_to_sync(request)()
+
+    def test_read_views_run_under_asgi(self):
+        task = self.create_task()
+        TimeLoging.objects.create(author=self.worker, time_spent=2, comment='Logged', task=task)
+        self.async_client.force_login(self.worker)
+
+        for name in ('main:project', 'main:task', 'main:time_loging'):
+            args = ['tracker'] if name == 'main:project' else ['tracker', task.id]
+            url = reverse(name, args=args)
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(url).func))
+            self.assertContains(self.get(url), task.topic)
+
+        self.async_client.force_login(self.admin)
+        self.assertRedirects(self.get(reverse('main:index')), reverse('main:projects'), fetch_redirect_response=False)
+
+    def test_profiles_include_the_sync_part_of_async_views(self):
+        self.create_task()
+        self.async_client.force_login(self.admin)
+        self.get(reverse('main:project', args=['tracker']) + '?profile=1')
+
+        profile, = list_profiles()
+        self.assertTrue(any('main_task' in query['sql'] for query in profile['queries']))
+        self.assertTrue(any('main/views.py' in frame['function'] for frame in profile['top_cumulative']))
+
+    def test_exports_stream_through_the_asgi_application(self):
+        for number in range(5):
+            self.create_task(topic=f'Exported task {number}')
+        self.client.force_login(self.worker)
+        session = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        path = reverse('main:tasks_export', args=['tracker'])
+
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session}'.encode())],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        async def request():
+            # without the ThreadSensitiveContext of tracker.asgi.application,
+            # whose thread would not see the data of the test transaction
+            await TrackerASGIHandler()(scope, receive, send)
+
+        async_to_sync(request)()
+        self.assertEqual(messages[0]['status'], 200)
+        rows = list(csv.reader(b''.join(message.get('body', b'') for message in messages[1:]).decode().splitlines()))
+        self.assertEqual(rows[0][:2], ['id', 'topic'])
+        self.assertEqual([row[1] for row in rows[1:]], [f'Exported task {number}' for number in range(5)])
+
+
+class LoadTestTests(TestCase):
+    RESPONSES = {
+        b'/ok': b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok',
+        b'/chunked': b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n2\r\nok\r\n0\r\n\r\n',
+        b'/missing': b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n',
+    }
+
+    async def serve(self, reader, writer):
+        path = None
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if path is None:
+                path = line.split()[1]
+            elif line == b'\r\n':
+                writer.write(self.RESPONSES[path])
+                await writer.drain()
+                path = None
+        writer.close()
+
+    def test_keep_alive_responses_are_read(self):
+        async def load():
+            server = await asyncio.start_server(self.serve, '127.0.0.1', 0)
+            async with server:
+                url = f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}'
+                return await apply_load('test', url, ['/ok', '/chunked', '/missing'], concurrency=3, duration=0.2)
+
+        result = asyncio.run(load())
+        # every third request is the 404
+        self.assertGreater(result.errors, 0)
+        self.assertAlmostEqual(result.errors / result.requests, 1 / 3, delta=0.05)
+        self.assertEqual(set(result.summary()), {'requests', 'errors', 'rps', 'p50', 'p99'})
+
+
+class StaticFilesTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = os.path.join(directory.name, 'source')
+        self.root = os.path.join(directory.name, 'root')
+        os.makedirs(os.path.join(source, 'css'))
+        os.makedirs(os.path.join(source, 'img'))
+        with open(os.path.join(source, 'css', 'site.css'), 'w') as file:
+            file.write('body { background: url("../img/bg.png"); }\n' + '.item { color: #123456; }\n' * 100)
+        with open(os.path.join(source, 'img', 'bg.png'), 'wb') as file:
+            file.write(b'\x89PNG' + bytes(range(256)) * 4)
+
+        overrides = override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATICFILES_STORAGE='main.staticfiles.CompressedManifestStaticFilesStorage',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        self.css = staticfiles_storage.stored_name('css/site.css')
+        self.server = PrecompressedStaticFiles(lambda environ, start_response: [b'django'], self.root, '/static/')
+
+    def request(self, path, **headers):
+        response = {}
+
+        def start_response(status, response_headers):
+            response['status'] = int(status.split()[0])
+            response['headers'] = dict(response_headers)
+
+        body = b''.join(self.server({'PATH_INFO': path, 'REQUEST_METHOD': 'GET', **headers}, start_response))
+        return response.get('status'), response.get('headers', {}), body
+
+    def test_hashed_files_are_served_precompressed(self):
+        with open(os.path.join(self.root, self.css), 'rb') as file:
+            css = file.read()
+        self.assertIn(staticfiles_storage.stored_name('img/bg.png').encode(), css)
+        self.assertFalse(os.path.exists(os.path.join(self.root, staticfiles_storage.stored_name('img/bg.png') + '.gz')))
+
+        status, headers, body = self.request(f'/static/{self.css}', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual((status, headers['Content-Encoding']), (200, 'br'))
+        self.assertEqual(brotli.decompress(body), css)
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+
+        status, headers, body = self.request(f'/static/{self.css}', HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual((headers['Content-Encoding'], gzip.decompress(body)), ('gzip', css))
+        status, headers, body = self.request(f'/static/{self.css}')
+        self.assertEqual((body, 'Content-Encoding' in headers), (css, False))
+        self.assertEqual(self.request(f'/static/{self.css}', HTTP_IF_NONE_MATCH=headers['ETag'])[0], 304)
+
+        # the names without a hash are not cached for long
+        self.assertEqual(self.request('/static/css/site.css')[1]['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(self.request('/static/css/missing.css')[0], 404)
+        self.assertEqual(self.request('/main/')[2], b'django')
+
+
+class BenchmarkTests(TestCase):
+    def test_every_url_has_a_scenario_and_a_budget(self):
+        urls = {
+            name for name in url_names(get_resolver().url_patterns, None)
+            if name.split(':')[0] in ('main', 'accounts', 'api')
+        }
+        self.assertEqual(urls - {scenario.url_name for scenario in SCENARIOS}, set())
+        self.assertEqual(set(load_budgets()), {scenario.name for scenario in SCENARIOS})
+
+    def test_check_reports_every_metric_over_budget(self):
+        budget = {'queries': 5, 'warm_queries': 3, 'ms': 50, 'bytes': 1000}
+        result = {'status': 200, 'queries': 15, 'warm_queries': 3, 'ms': 80, 'bytes': 900}
+
+        self.assertEqual(check(result, budget), ['queries 15 > 5', 'ms 80 > 50'])
+        self.assertEqual(check(result, budget, skip_time=True), ['queries 15 > 5'])
+        self.assertEqual(check({**result, 'status': 500}, budget), ['status 500'])
+
+
+class DatasetGeneratorTests(TestCase):
+    def test_chunks_create_consistent_rows(self):
+        generator = DatasetGenerator(users=4, projects=2, tasks=5, comments_per_task=2, logs_per_task=3, chunk_size=2)
+        generator.prepare()
+        # chunks do not depend on each other
+        for number in reversed(generator.chunks):
+            generator.create_chunk(number)
+        generator.finish()
+
+        self.assertEqual((Task.objects.count(), Comment.objects.count(), TimeLoging.objects.count()), (5, 10, 15))
+        self.assertEqual(list(iter_rollup_mismatches()), [])
+        self.assertEqual(
+            DailyTimeRollup.objects.aggregate(total=Sum('time_spent')),
+            TimeLoging.objects.aggregate(total=Sum('time_spent')),
+        )
+
+        worker = User.objects.get(pk=generator.members[generator.project_ids[0]][0])
+        self.assertEqual(get_workable_projects(worker), {Project.objects.get(pk=generator.project_ids[0]).unique_name})
+        self.assertTrue(search_tasks(Task.objects.first().topic.split()[0]))
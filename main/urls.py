@@ -5,10 +5,12 @@ from . import views
 app_name = 'main'
 
 urlpatterns = [
-    path('', views.Index.as_view(), name='index'),
+    path('', views.index, name='index'),
     path('project/', views.Projects.as_view(), name='projects'),
     path('edit_project/<str:project_name>/', views.EditProject.as_view(), name='edit_project'),
     path('project/<str:project_name>/', views.project, name='project'),
+    path('project/<str:project_name>/export/tasks/', views.tasks_export, name='tasks_export'),
+    path('project/<str:project_name>/export/time_logs/', views.time_logs_export, name='time_logs_export'),
     path(
         'project/<str:project_name>/task/<int:task_id>/',
         views.task,
@@ -29,4 +31,8 @@ urlpatterns = [
         views.LogEdit.as_view(),
         name='log_edit'
     ),
+    path('import_time_logs/', views.ImportTimeLogsView.as_view(), name='import_time_logs'),
+    path('time_report/', views.TimeReportView.as_view(), name='time_report'),
+    path('search/', views.search, name='search'),
+    path('profiles/', views.ProfilesView.as_view(), name='profiles'),
 ]
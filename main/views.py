@@ -1,27 +1,67 @@
+import io
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.models import User, Group
+from django.db import transaction
 from django.db.models import Sum
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
 from django.forms import fields
-from guardian.decorators import permission_required_or_403
-from django.shortcuts import redirect, render
-from django.http import HttpResponseRedirect
+from django.shortcuts import get_object_or_404, redirect, render
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseRedirect, StreamingHttpResponse,
+)
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import TemplateView, View, ListView
 from django.views.generic.edit import FormView
 from django.utils.translation import gettext_lazy as _
 from guardian.shortcuts import assign_perm
 
 from accounts.utils import send_change_notification
-from .models import Project, TaskType, TaskPriority, Task, Comment, TimeLoging
-from .forms import ProjectForm, ChangeProjectForm, TaskForm, CommentForm, TimeLogingForm, TestForm
+from .models import Project, TaskType, TaskPriority, Task, Comment, TimeLoging, DailyTimeRollup
+from .forms import (
+    ProjectForm, ChangeProjectForm, TaskForm, EditTaskForm, CommentForm, TimeLogingForm, TimeLogImportForm,
+    TimeLogExportForm, TimeReportForm, TestForm,
+)
+from .exports import export_tasks, export_time_logs
+from .fragments import fragment_version, project_fragment_version
+from .history import HISTORY_SIZE, TaskConflict, change_notification_text, describe_changes, update_task
+from .importers import TimeLogImporter
+from .membership import sync_project_members
+from .metrics import metrics_text
+from .pagination import CursorPaginator
+from .profiling import list_profiles
+from .permissions import get_workable_projects, work_on_project_required
+from .reference import task_types, task_priorities
+from .rollups import get_task_rollup
+from .search import TaskSearchPaginator
 
 
 def check_user_group(user):
     return user.is_superuser or user 
 
 
+def async_view(view):
+    """
+    Serve the sync `view` as a coroutine.
+
+    Django 3.2 has no async ORM, cache or sessions, so the work of the view
+    runs in one thread sensitive hop: under ASGI it takes the thread of its
+    request (see tracker.asgi) only while it runs, the event loop and the
+    async middleware handle everything around it.
+    """
+    run = sync_to_async(view, thread_sensitive=True)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run(request, *args, **kwargs)
+
+    return wrapper
+
+
 class AdminOnlyView(View):
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_superuser:
@@ -46,12 +86,20 @@ class Index(LoginRequiredMixin, View):
             return redirect('accounts:profile')
 
 
+index = async_view(Index.as_view())
+
+
 class Projects(AdminOnlyView, FormView, ListView):
     model = Project
     form_class = ProjectForm
-    paginate_by = 1
     template_name = 'main/projects.html'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = CursorPaginator(self.object_list)
+        context['page_obj'] = paginator.get_page(self.request.GET.get('cursor'))
+        return context
+
     def form_valid(self, form):
         request = self.request
         unique_name_arg = form.cleaned_data['unique_name']
@@ -64,25 +112,22 @@ class Projects(AdminOnlyView, FormView, ListView):
 
 
         else:
-            # create group for user, how will worked on this project
-            group_executors = Group.objects.create(name=unique_name_arg)
-
-            new_project = Project()
-            new_project.title = form.cleaned_data['title']
-            new_project.description = form.cleaned_data['description']
-            new_project.unique_name = unique_name_arg
-            new_project.group_executors = group_executors
-            new_project.save()
-
-            # add workers to group
-            for user_id in form.cleaned_data['workers']:
-                executor = User.objects.get(pk=user_id)
-                group_executors.user_set.add(executor)
-                # set user project foreign key
-                executor.employee.project = new_project
-
-            # assign permissions for group executors
-            assign_perm('work_on_project', group_executors, new_project)
+            with transaction.atomic():
+                # create group for user, how will worked on this project
+                group_executors = Group.objects.create(name=unique_name_arg)
+
+                new_project = Project()
+                new_project.title = form.cleaned_data['title']
+                new_project.description = form.cleaned_data['description']
+                new_project.unique_name = unique_name_arg
+                new_project.group_executors = group_executors
+                new_project.save()
+
+                # add workers to group and set their project foreign key
+                sync_project_members(new_project, form.cleaned_data['workers'])
+
+                # assign permissions for group executors
+                assign_perm('work_on_project', group_executors, new_project)
 
             messages.success(request, _('You are successfully add new project!'))
 
@@ -94,61 +139,44 @@ class EditProject(AdminOnlyView, FormView):
     form_class = ChangeProjectForm
 
     def get_initial(self):
-        project = Project.objects.get(
-            unique_name=self.kwargs["project_name"]
-        )
+        project = self.request.project
         initial = super().get_initial()
         initial['title'] = project.title
         initial['description'] = project.description
-        initial['workers'] = [executor.id for executor in User.objects.filter(groups__name=project.group_executors.name)]
+        initial['workers'] = list(project.group_executors.user_set.values_list('id', flat=True))
         return initial
 
     def form_valid(self, form):
         request = self.request
-        project = Project.objects.get(
-            unique_name=self.kwargs["project_name"]
-        )
+        project = request.project
 
         project.title = form.cleaned_data['title']
         project.description = form.cleaned_data['description']
         project.save()
 
-        # change group_executors
-        group_executors = project.group_executors 
-        workers = form.cleaned_data['workers']
-        all_users = [user for user in User.objects.exclude(username="AnonymousUser").filter(is_superuser=False)]
-        for user in all_users:
-            if str(user.id) in workers:
-                group_executors.user_set.add(user)
-                # change user project foreign key
-                user.employee.project = project
-            else:
-                group_executors.user_set.remove(user)
-                # delete user project foreign key
-                if user.employee.project == project:
-                    user.employee.project = None
-            
-            user.employee.save()
+        # change group_executors and the user project foreign keys
+        sync_project_members(project, form.cleaned_data['workers'])
 
         messages.success(request, _('You are successfully edit this project!'))
 
         return redirect('main:projects')
 
 
+@async_view
 @login_required
-@permission_required_or_403('main.work_on_project', (Project, 'unique_name', 'project_name'))
+@work_on_project_required
 def project(request, project_name):
     current_user = request.user
-    project = Project.objects.get(unique_name=project_name)
-    tasks = project.tasks.all()
-    paginate_by = 1
+    project = request.project
+    tasks = project.tasks.for_list()
+    query = request.GET.get('q', '').strip()
     dict_for_template = {
         "project": project,
-        "query": tasks,
+        "query": query,
     }
     template_name = 'main/project.html'
 
-    form = TaskForm(request.POST, project_name=project_name)
+    form = TaskForm(request.POST, project=project)
     if request.method == 'POST' and current_user.is_superuser:
         if form.is_valid():
             new_task = Task()
@@ -156,12 +184,8 @@ def project(request, project_name):
             new_task.description = form.cleaned_data['description']
             new_task.start_date = form.cleaned_data['start_date']
             new_task.finish_date = form.cleaned_data['finish_date']
-            new_task.type = TaskType.objects.get(
-                pk=int(form.cleaned_data['type'])
-            )
-            new_task.priority = TaskPriority.objects.get(
-                pk=int(form.cleaned_data['priority'])
-            )
+            new_task.type = task_types.get(form.cleaned_data['type'])
+            new_task.priority = task_priorities.get(form.cleaned_data['priority'])
             new_task.estimated_time = form.cleaned_data['estimated_time']
             new_task.executor = User.objects.get(
                 pk=int(form.cleaned_data['executor'])
@@ -174,31 +198,57 @@ def project(request, project_name):
 
             return HttpResponseRedirect(request.path_info)
 
-    paginator = Paginator(tasks, paginate_by)
-
-    page_number = request.GET.get('page')
-    dict_for_template["page_obj"] = paginator.get_page(page_number)
+    if query:
+        paginator = TaskSearchPaginator(query, [project.id])
+    else:
+        paginator = CursorPaginator(tasks)
+    cursor = request.GET.get('cursor')
+    # only queried when the cached fragment is missing
+    dict_for_template["page_obj"] = SimpleLazyObject(lambda: paginator.get_page(cursor))
+    dict_for_template["cursor"] = cursor
+    # the search results also depend on the comments, they are not cached
+    dict_for_template["fragment_version"] = None if query else project_fragment_version(project.id)
 
     if current_user.is_superuser:
-        dict_for_template["form"] = TaskForm(project_name=project_name)
+        dict_for_template["form"] = TaskForm(project=project)
 
     return render(request, template_name, dict_for_template)
 
 
 @login_required
-@permission_required_or_403('main.work_on_project', (Project, 'unique_name', 'project_name'))
+def search(request):
+    query = request.GET.get('q', '').strip()
+    project_ids = []
+    if request.user.is_superuser:
+        project_ids = None
+    elif query:
+        project_ids = list(Project.objects.filter(
+            unique_name__in=get_workable_projects(request.user)
+        ).values_list('id', flat=True))
+
+    paginator = TaskSearchPaginator(query, project_ids)
+
+    return render(request, 'main/search.html', {
+        "query": query,
+        "page_obj": paginator.get_page(request.GET.get('cursor')),
+    })
+
+
+@async_view
+@login_required
+@work_on_project_required
 def task(request, project_name, task_id):
     current_user = request.user
-    current_task = Task.objects.get(pk=task_id)
-    comments = current_task.comments.order_by('created').all()
-    paginate_by = 1
+    current_task = get_object_or_404(Task, pk=task_id, project=request.project)
+    # the authors and their avatars in the same query
+    comments = current_task.comments.select_related('author__employee')
     dict_for_template = {
         "project_name": project_name,
         "task": current_task,
     }
     template_name = 'main/task.html'
 
-    dict_for_template["spend_time"] = current_task.time_loging.aggregate(Sum('time_spent'))['time_spent__sum'] or 0
+    dict_for_template["spend_time"] = get_task_rollup(current_task).time_spent
 
     if request.method == 'POST':
         form = CommentForm(request.POST)
@@ -213,37 +263,22 @@ def task(request, project_name, task_id):
 
             return HttpResponseRedirect(request.path_info)
 
-    paginator = Paginator(comments, paginate_by)
-
-    page_number = request.GET.get('page')
-    dict_for_template["page_obj"] = paginator.get_page(page_number)
+    paginator = CursorPaginator(comments, ordering=('created', 'id'))
+    cursor = request.GET.get('cursor')
+    dict_for_template["page_obj"] = SimpleLazyObject(lambda: paginator.get_page(cursor))
+    dict_for_template["cursor"] = cursor
+    dict_for_template["fragment_version"] = fragment_version('task', current_task.id)
 
     dict_for_template["form"] = CommentForm()
 
     return render(request, template_name, dict_for_template)
 
 
-def add_to_list_change(list_change, name_field, field, new_value):
-    change_text = "Field: {name_field}. Old value: {old_value}; new value: {new_value}."
-
-    if field != new_value:
-        list_change.append(
-            change_text.format(
-                name_field = name_field,
-                old_value = field,
-                new_value = new_value
-            )
-        )
-        field = new_value
-
-    return list_change, field
-
-
 @login_required
-@permission_required_or_403('main.work_on_project', (Project, 'unique_name', 'project_name'))
+@work_on_project_required
 def edit_task(request, project_name, task_id):
     current_user = request.user
-    current_task = Task.objects.get(pk=task_id)
+    current_task = get_object_or_404(Task, pk=task_id, project=request.project)
     dict_for_template = {
         "project_name": project_name,
         "task": current_task,
@@ -251,109 +286,61 @@ def edit_task(request, project_name, task_id):
     template_name = 'main/edit_task.html'
 
     if request.method == 'POST':
-        form = TaskForm(request.POST, project_name=project_name)
+        form = EditTaskForm(request.POST, project=request.project)
         if form.is_valid():
-            list_change = []
-
-            list_change, current_task.topic = add_to_list_change(
-                list_change,
-                "topic",
-                current_task.topic,
-                form.cleaned_data['topic'],
-            )
-
-            list_change, current_task.description = add_to_list_change(
-                list_change,
-                "description",
-                current_task.description,
-                form.cleaned_data['description'],
-            )
-
-            list_change, current_task.start_date = add_to_list_change(
-                list_change,
-                "start_date",
-                current_task.start_date,
-                form.cleaned_data['start_date'],
-            )
-
-            list_change, current_task.finish_date = add_to_list_change(
-                list_change,
-                "finish_date",
-                current_task.finish_date,
-                form.cleaned_data['finish_date'],
-            )
-
-            list_change, current_task.type = add_to_list_change(
-                list_change,
-                "type",
-                current_task.type,
-                TaskType.objects.get(
-                    pk=int(form.cleaned_data['type'])
-                ),
-            )
-
-            list_change, current_task.priority = add_to_list_change(
-                list_change,
-                "priority",
-                current_task.priority,
-                TaskPriority.objects.get(
-                    pk=int(form.cleaned_data['priority'])
-                ),
-            )
-
-            list_change, current_task.estimated_time = add_to_list_change(
-                list_change,
-                "estimated_time",
-                current_task.estimated_time,
-                form.cleaned_data['estimated_time'],
-            )
-
-            list_change, current_task.executor = add_to_list_change(
-                list_change,
-                "executor",
-                current_task.executor,
-                User.objects.get(
-                    pk=int(form.cleaned_data['executor'])
-                ),
-            )
-
-            if len(list_change) != 0:
-                current_task.save()
-                text_list_change = f"Editor: {current_user}.\n" + "\n".join(list_change)
-                # send email
-                send_change_notification(text_list_change, current_task)
-                print(text_list_change)
-
+            values = {
+                "topic": form.cleaned_data['topic'],
+                "description": form.cleaned_data['description'],
+                "start_date": form.cleaned_data['start_date'],
+                "finish_date": form.cleaned_data['finish_date'],
+                "type": task_types.get(form.cleaned_data['type']).id,
+                "priority": task_priorities.get(form.cleaned_data['priority']).id,
+                "estimated_time": form.cleaned_data['estimated_time'],
+                "executor": int(form.cleaned_data['executor']),
+            }
+
+            try:
+                changes = update_task(current_task, values, current_user, form.cleaned_data['version'])
+            except TaskConflict:
+                messages.warning(request, _('The task has been changed by somebody else, check the new values!'))
+                return redirect('main:edit_task', project_name=project_name, task_id=current_task.id)
+
+            if changes:
+                send_change_notification(change_notification_text(current_user, changes), current_task)
                 messages.success(request, _('You are successfully edit task!'))
             else:
                 messages.warning(request, _('Not found change in task fields!'))
 
             return redirect('main:task', project_name=project_name, task_id=current_task.id)
 
-    dict_for_template["form"] = TaskForm(
+    dict_for_template["form"] = EditTaskForm(
         initial={
             "topic": current_task.topic,
             "description": current_task.description,
             "start_date": current_task.start_date,
             "finish_date": current_task.finish_date,
-            "type": current_task.type.id,
-            "priority": current_task.priority.id,
+            "type": current_task.type_id,
+            "priority": current_task.priority_id,
             "estimated_time": current_task.estimated_time,
-            "executor": current_task.executor.id,
+            "executor": current_task.executor_id,
+            "version": current_task.version,
         },
-        project_name=project_name,
+        project=request.project,
+    )
+    dict_for_template["changes"] = describe_changes(
+        list(current_task.changes.select_related('editor').order_by('-id')[:HISTORY_SIZE])
     )
 
     return render(request, template_name, dict_for_template)
 
 
+@async_view
 @login_required
-@permission_required_or_403('main.work_on_project', (Project, 'unique_name', 'project_name'))
+@work_on_project_required
 def time_loging(request, project_name, task_id):
     current_user = request.user
-    current_task = Task.objects.get(pk=task_id)
-    time_loging = current_task.time_loging.all()
-    paginate_by = 1
+    current_task = get_object_or_404(Task, pk=task_id, project=request.project)
+    time_loging = current_task.time_loging.select_related('author__employee')
     dict_for_template = {
         "project_name": project_name,
         "task": current_task,
@@ -367,23 +354,55 @@ def time_loging(request, project_name, task_id):
             new_log.author = current_user
             new_log.time_spent = form.cleaned_data['time_spent']
             new_log.comment = form.cleaned_data['comment']
+            new_log.date = form.cleaned_data['date']
             new_log.task = current_task
-            new_log.save()
+            with transaction.atomic():
+                new_log.save()
 
             messages.success(request, _('You are successfully add new log!'))
 
             return HttpResponseRedirect(request.path_info)
 
-    paginator = Paginator(time_loging, paginate_by)
-
-    page_number = request.GET.get('page')
-    dict_for_template["page_obj"] = paginator.get_page(page_number)
+    paginator = CursorPaginator(time_loging)
+    dict_for_template["page_obj"] = paginator.get_page(request.GET.get('cursor'))
 
     dict_for_template["form"] = TimeLogingForm()
 
     return render(request, template_name, dict_for_template)
 
 
+def csv_response(rows, filename):
+    response = StreamingHttpResponse(rows, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@work_on_project_required
+def tasks_export(request, project_name):
+    return csv_response(export_tasks(request.project), f'{project_name}-tasks.csv')
+
+
+@login_required
+@work_on_project_required
+def time_logs_export(request, project_name):
+    form = TimeLogExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+
+    return csv_response(
+        export_time_logs(request.project, **form.cleaned_data), f'{project_name}-time-logs.csv'
+    )
+
+
+def metrics(request):
+    # scraped from the host itself; requests through a proxy carry X-Forwarded-For
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS or 'HTTP_X_FORWARDED_FOR' in request.META:
+        return HttpResponseForbidden()
+
+    return HttpResponse(metrics_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class LogEdit(AdminOnlyView, FormView):
     template_name = 'main/edit_log.html'
     form_class = TimeLogingForm
@@ -395,6 +414,7 @@ class LogEdit(AdminOnlyView, FormView):
         initial = super().get_initial()
         initial['comment'] = log.comment
         initial['time_spent'] = log.time_spent
+        initial['date'] = log.date
         return initial
 
     def form_valid(self, form):
@@ -405,7 +425,9 @@ class LogEdit(AdminOnlyView, FormView):
 
         log.comment = form.cleaned_data['comment']
         log.time_spent = form.cleaned_data['time_spent']
-        log.save()
+        log.date = form.cleaned_data['date']
+        with transaction.atomic():
+            log.save()
 
         messages.success(request, _('You are successfully edit this log!'))
 
@@ -416,5 +438,73 @@ class LogEdit(AdminOnlyView, FormView):
         )
 
 
+class TimeReportView(AdminOnlyView, TemplateView):
+    template_name = 'main/time_report.html'
+    group_fields = {
+        'author': ['author__username'],
+        'project': ['project__title'],
+        'author_project': ['author__username', 'project__title'],
+    }
+    # the titles are not unique, the projects are told apart by id
+    group_keys = {
+        'author': ['author__username'],
+        'project': ['project'],
+        'author_project': ['author__username', 'project'],
+    }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = TimeReportForm(self.request.GET or None)
+        context['form'] = form
+
+        if form.is_valid():
+            fields = self.group_fields[form.cleaned_data['group_by']]
+            keys = self.group_keys[form.cleaned_data['group_by']]
+            context['fields'] = fields
+            context['rows'] = DailyTimeRollup.objects.filter(
+                day__range=(form.cleaned_data['date_from'], form.cleaned_data['date_to']),
+                log_count__gt=0,
+            ).values(*keys).annotate(
+                hours=Sum('time_spent'), logs=Sum('log_count'),
+            ).values_list(*fields, 'hours', 'logs').order_by(*fields, *keys)
+
+        return context
+
+
+class ImportTimeLogsView(LoginRequiredMixin, FormView):
+    template_name = 'main/import_time_logs.html'
+    form_class = TimeLogImportForm
+    shown_errors = 100
+
+    def form_valid(self, form):
+        request = self.request
+        importer = TimeLogImporter(default_author=request.user, uploader=request.user)
+        stream = io.TextIOWrapper(form.cleaned_data['file'].file, encoding=form.encoding, newline='')
+
+        errors = []
+        for error in importer.import_stream(stream, form.cleaned_data['format']):
+            if len(errors) < self.shown_errors:
+                errors.append(error)
+
+        if importer.imported:
+            messages.success(request, _('Imported %(count)s log(s).') % {'count': importer.imported})
+        if importer.failed:
+            messages.warning(request, _('%(count)s row(s) were skipped.') % {'count': importer.failed})
+
+        return self.render_to_response(self.get_context_data(
+            form=self.form_class(), errors=errors, hidden_errors=importer.failed - len(errors),
+        ))
+
+
 class ChangeLanguageView(TemplateView):
-    template_name = 'main/change_language.html'
\ No newline at end of file
+    template_name = 'main/change_language.html'
+
+
+class ProfilesView(AdminOnlyView, TemplateView):
+    template_name = 'main/profiles.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['profiles'] = list_profiles()
+        context['profile_dir'] = settings.PROFILE_DIR
+        return context
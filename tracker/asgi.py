@@ -9,8 +9,51 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tracker.settings')
 
-application = get_asgi_application()
+
+class TrackerASGIHandler(ASGIHandler):
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        # Django iterates streamed responses on the event loop, but the CSV
+        # exports query the database as they go: every part is made in the
+        # thread of the request instead
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (header.encode('ascii'), value.encode('latin1')) for header, value in response.items()
+            ] + [
+                (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+                for cookie in response.cookies.values()
+            ],
+        })
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body'})
+
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+django.setup(set_prefix=False)
+django_application = TrackerASGIHandler()
+
+
+async def application(scope, receive, send):
+    # the sync code of every request (views, database, cache) runs in a thread
+    # of its own, not in the one thread all the requests share by default
+    async with ThreadSensitiveContext():
+        await django_application(scope, receive, send)
@@ -35,12 +35,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.middleware.ProfilerMiddleware',
+    'main.middleware.ProjectMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -49,7 +52,7 @@ ROOT_URLCONF = 'tracker.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'main.metrics.DjangoTemplates',
         'DIRS': [
             os.path.join(CONTENT_DIR, 'templates'),
         ],
@@ -73,6 +76,12 @@ EMAIL_FILE_PATH = os.path.join(CONTENT_DIR, 'tmp/emails')
 EMAIL_HOST_USER = 'test@example.com'
 DEFAULT_FROM_EMAIL = 'test@example.com'
 
+# Task change notifications are queued and sent by the send_outbox command
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# seconds before the first retry, doubled after every failed attempt
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -85,6 +94,12 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -115,6 +130,15 @@ SIGN_UP_FIELDS = ['username', 'first_name', 'last_name', 'email', 'password1', '
 if DISABLE_USERNAME:
     SIGN_UP_FIELDS = ['first_name', 'last_name', 'email', 'password1', 'password2']
 
+# Page size of the cursor paginated lists (tasks, comments, time logs)
+PAGINATE_BY = 10
+
+# how long rendered fragments of the project and task pages are kept, they are versioned anyway
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# text search configuration of the PostgreSQL full-text search
+SEARCH_CONFIG = 'english'
+
 MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
 
 USE_I18N = True
@@ -148,3 +172,13 @@ AUTHENTICATION_BACKENDS = (
     'django.contrib.auth.backends.ModelBackend', # this is default
     'guardian.backends.ObjectPermissionBackend',
 )
+
+# per process counters of main.metrics, added up by /metrics/
+METRICS_DIR = os.path.join(CONTENT_DIR, 'tmp/metrics')
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# request profiles of main.profiling, PROFILE_SAMPLE_RATE = n profiles one in n requests (0 is off)
+PROFILE_DIR = os.path.join(CONTENT_DIR, 'tmp/profiles')
+PROFILE_KEEP = 50
+PROFILE_SAMPLE_RATE = 0
@@ -34,12 +34,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'main.middleware.ProfilerMiddleware',
+    'main.middleware.ProjectMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -48,7 +51,7 @@ ROOT_URLCONF = 'tracker.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'main.metrics.DjangoTemplates',
         'DIRS': [
             os.path.join(CONTENT_DIR, 'templates'),
         ],
@@ -77,6 +80,12 @@ EMAIL_PORT = 465
 EMAIL_USE_TLS = False
 EMAIL_USE_SSL = True
 
+# Task change notifications are queued and sent by the send_outbox command
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# seconds before the first retry, doubled after every failed attempt
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -84,6 +93,15 @@ DATABASES = {
     }
 }
 
+# Shared by all the workers on the host, the reference data and choices caches
+# use it to tell each other about changes
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CONTENT_DIR, 'tmp/cache'),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -110,6 +128,15 @@ USE_REMEMBER_ME = True
 RESTORE_PASSWORD_VIA_EMAIL_OR_USERNAME = True
 EMAIL_ACTIVATION_AFTER_CHANGING = True
 
+# Page size of the cursor paginated lists (tasks, comments, time logs)
+PAGINATE_BY = 10
+
+# how long rendered fragments of the project and task pages are kept, they are versioned anyway
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# text search configuration of the PostgreSQL full-text search
+SEARCH_CONFIG = 'english'
+
 MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
 
 USE_I18N = True
@@ -123,8 +150,10 @@ LANGUAGES = [
 TIME_ZONE = 'UTC'
 USE_TZ = True
 
-# STATIC_ROOT = os.path.join(CONTENT_DIR, 'static')
+# collectstatic writes the hashed files and their .gz/.br variants here, tracker.wsgi serves them
+STATIC_ROOT = os.path.join(CONTENT_DIR, 'static_root')
 STATIC_URL = '/static/'
+STATICFILES_STORAGE = 'main.staticfiles.CompressedManifestStaticFilesStorage'
 
 MEDIA_ROOT = os.path.join(CONTENT_DIR, 'media')
 MEDIA_URL = '/media/'
@@ -147,3 +176,16 @@ AUTHENTICATION_BACKENDS = (
     'django.contrib.auth.backends.ModelBackend', # this is default
     'guardian.backends.ObjectPermissionBackend',
 )
+
+# per process counters of main.metrics, added up by /metrics/
+METRICS_DIR = os.path.join(CONTENT_DIR, 'tmp/metrics')
+METRICS_FLUSH_INTERVAL = 5
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# request profiles of main.profiling, PROFILE_SAMPLE_RATE = n profiles one in n requests (0 is off)
+PROFILE_DIR = os.path.join(CONTENT_DIR, 'tmp/profiles')
+PROFILE_KEEP = 50
+PROFILE_SAMPLE_RATE = 0
+
+# the tests render {% static %} without a collectstatic first
+TEST_RUNNER = 'tracker.test_runner.TestRunner'
@@ -0,0 +1,40 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from main.metrics import registry
+
+# the production cache is shared with the running site
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    }
+}
+
+
+class TestRunner(DiscoverRunner):
+    """
+    The tests use a cache and metrics and profiles directories of their own,
+    and the plain static files storage: the manifest only exists after
+    collectstatic.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.directory = tempfile.TemporaryDirectory()
+        self.overrides = override_settings(
+            CACHES=TEST_CACHES,
+            METRICS_DIR=f'{self.directory.name}/metrics',
+            PROFILE_DIR=f'{self.directory.name}/profiles',
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        )
+        self.overrides.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # the requests of the tests are not flushed to the real directory at exit
+        registry.reset()
+        self.overrides.disable()
+        self.directory.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -3,15 +3,17 @@ from django.conf import settings
 from django.urls import include, path
 from django.conf.urls.static import static
 
-from main.views import ChangeLanguageView, Index
+from main.views import ChangeLanguageView, index, metrics
 
 urlpatterns = [
     path('main/', include('main.urls')),
     path('accounts/', include('accounts.urls')),
+    path('api/v1/', include('main.api_urls')),
     path('admin/', admin.site.urls),
     path('language/', ChangeLanguageView.as_view(), name='change_language'),
-    path('', Index.as_view(), name='index'),
+    path('', index, name='index'),
     path('tinymce/', include('tinymce.urls')),
+    path('metrics/', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
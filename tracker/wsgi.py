@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tracker.settings')
 
 application = get_wsgi_application()
+
+# the collected static files are answered before Django, see main.staticfiles
+from main.staticfiles import static_application  # noqa: E402
+
+application = static_application(application, settings)